@@ -0,0 +1,74 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    """Fold case, punctuation and whitespace so trivially different queries share a key"""
+    folded = _PUNCTUATION.sub(" ", query.casefold())
+    return _WHITESPACE.sub(" ", folded).strip()
+
+class AnswerCache:
+    """Bounded, thread-safe LRU cache of answers with a time-to-live.
+
+    One instance is shared by every Streamlit session in the process, so each
+    session's script thread goes through the same lock.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 3600.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, query: str) -> bool:
+        """Whether a fresh answer is cached, without touching the counters or LRU order"""
+        entry = self._entries.get(normalize_query(query))
+        return entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds
+
+    def get(self, query: str) -> Optional[str]:
+        """Return the cached answer for a query, or None if missing or expired"""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, query: str, answer: str):
+        """Store an answer, evicting the least recently used entry when full"""
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
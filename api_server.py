@@ -0,0 +1,334 @@
+"""JSON API over the chatbot pipeline.
+
+Runs on asyncio with HTTP/1.1 keep-alive and a bounded number of in-flight
+requests. The pipeline itself is blocking, so it runs on a thread pool and
+the event loop only moves bytes. Started from app.py (ApiConfig.enabled) it
+shares every cache and loaded model with the Streamlit sessions; it can
+also run on its own:
+
+    python api_server.py --port 8765
+
+    POST /answer    {"query": "...", "stream": false}
+    POST /retrieve  {"query": "..."}
+    GET  /health
+    GET  /stats
+"""
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import replace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import chatbot
+from config import ApiConfig, get_config
+from interaction_log import log_interaction
+from response_cache import RESPONSE_CACHE
+from retrieval import clean_chunk, keyword_search, relevant_chunks
+from semantic_cache import SEMANTIC_CACHE
+from tracing import turn
+from warmup import start_warmup, warmup_stats
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+MAX_QUERY_LENGTH = 2000
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def parse_query(payload: Any) -> str:
+    """The "query" field of a request body"""
+    query = payload.get("query") if isinstance(payload, dict) else None
+    if not isinstance(query, str) or not query.strip():
+        raise HttpError(400, 'Expected a JSON object with a non-empty "query" string')
+    if len(query) > MAX_QUERY_LENGTH:
+        raise HttpError(400, f"Query longer than {MAX_QUERY_LENGTH} characters")
+    return query.strip()
+
+def handle_answer(payload: Any) -> Dict[str, Any]:
+    query = parse_query(payload)
+    start = time.perf_counter()
+    cache_hit = query in chatbot.ANSWER_CACHE
+    with turn(query, source="api"):
+        answer = chatbot.answer_query(query)
+    log_interaction(query, answer, latency_ms=(time.perf_counter() - start) * 1000, cache_hit=cache_hit, source="api")
+    return {"query": query, "answer": answer}
+
+def handle_retrieve(payload: Any) -> Dict[str, Any]:
+    query = parse_query(payload)
+    config = get_config()
+    # same order as the answer cascade: full-text hits first, vectors when there are none
+    chunks = []
+    if config.enable_keyword_search and config.retrieval_mode != "hybrid":
+        chunks = keyword_search(query)
+    chunks = [{"text": clean_chunk(text), "score": score} for text, score in chunks or relevant_chunks(query)]
+    return {"query": query, "chunks": chunks}
+
+class ApiServer:
+    """Asyncio HTTP/1.1 server for the chatbot JSON API.
+
+    A connection is kept open between requests until the client asks to close
+    it or stays idle for keepalive_timeout. At most max_concurrency requests
+    hold a worker at once; one that waits longer than queue_timeout for a
+    slot gets a 503 instead of queueing without bound.
+    """
+
+    def __init__(self, config: ApiConfig):
+        self.config = config
+        self.executor = ThreadPoolExecutor(max_workers=config.max_concurrency, thread_name_prefix="api-worker")
+        self.routes: Dict[Tuple[str, str], Callable[[Any], Dict[str, Any]]] = {
+            ("POST", "/answer"): handle_answer,
+            ("POST", "/retrieve"): handle_retrieve,
+            ("GET", "/stats"): lambda _: self.stats(),
+        }
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.requests = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Warm the shared caches and start listening; the suggested questions keep warming in the background"""
+        self._slots = asyncio.Semaphore(self.config.max_concurrency)
+        await asyncio.get_running_loop().run_in_executor(self.executor, chatbot.sync_knowledge)
+        if get_config().warmup_enabled:
+            start_warmup()
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.config.host, self.config.port, limit=self.config.max_header_bytes
+        )
+        logger.info(f"API listening on http://{self.config.host}:{self.config.port}")
+        return self._server
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "api": {"requests": self.requests, "rejected": self.rejected, "in_flight": self.in_flight,
+                    "max_concurrency": self.config.max_concurrency},
+            "answer_cache": chatbot.ANSWER_CACHE.stats(),
+            "response_cache": RESPONSE_CACHE.stats(),
+            "semantic_cache": SEMANTIC_CACHE.stats(),
+            "warmup": warmup_stats(),
+        }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HttpError as e:
+                    await self._send_json(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._dispatch(writer, method, path, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.config.keepalive_timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(431, "Request headers too large")
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = request_line.split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        if version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive":
+            headers["connection"] = "close"
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > self.config.max_body_bytes:
+            raise HttpError(413, f"Body larger than {self.config.max_body_bytes} bytes")
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), self.config.body_timeout) if length else b""
+        except asyncio.TimeoutError:
+            raise HttpError(408, "Request body not received in time")
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, path: str, body: bytes, keep_alive: bool):
+        self.requests += 1
+        if path == "/health":
+            await self._send_json(writer, 200, {"status": "ok"}, keep_alive)
+            return
+        handler = self.routes.get((method, path))
+        if handler is None:
+            status = 405 if any(route_path == path for _, route_path in self.routes) else 404
+            await self._send_json(writer, status, {"error": f"{method} {path} is not supported"}, keep_alive)
+            return
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            await self._send_json(writer, 400, {"error": "Body is not valid JSON"}, keep_alive)
+            return
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.config.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            await self._send_json(writer, 503, {"error": "Server busy, try again"}, keep_alive)
+            return
+        self.in_flight += 1
+        try:
+            if path == "/answer" and isinstance(payload, dict) and payload.get("stream"):
+                await self._stream_answer(writer, parse_query(payload), keep_alive)
+                return
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, handler, payload)
+            await self._send_json(writer, 200, result, keep_alive)
+        except HttpError as e:
+            await self._send_json(writer, e.status, {"error": e.message}, keep_alive)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            logger.exception(f"{method} {path} failed")
+            await self._send_json(writer, 500, {"error": str(e)}, keep_alive)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def _stream_answer(self, writer: asyncio.StreamWriter, query: str, keep_alive: bool):
+        """Send the answer as NDJSON lines over a chunked response as it is produced"""
+        loop = asyncio.get_running_loop()
+        pieces: asyncio.Queue = asyncio.Queue()
+        # set once the client is gone, so the producer stops generating for nobody
+        disconnected = threading.Event()
+
+        def produce():
+            start = time.perf_counter()
+            cache_hit = query in chatbot.ANSWER_CACHE
+            answer = []
+            try:
+                with turn(query, source="api"):
+                    stream = chatbot.stream_answer(query)
+                    try:
+                        for piece in stream:
+                            if disconnected.is_set():
+                                return
+                            answer.append(piece)
+                            loop.call_soon_threadsafe(pieces.put_nowait, {"delta": piece})
+                    finally:
+                        # ends the generation thread behind the stream too
+                        stream.close()
+                log_interaction(query, "".join(answer), latency_ms=(time.perf_counter() - start) * 1000,
+                                cache_hit=cache_hit, source="api")
+            except Exception as e:
+                logger.warning(f"Streaming answer failed: {e}")
+                loop.call_soon_threadsafe(pieces.put_nowait, {"error": str(e)})
+            finally:
+                loop.call_soon_threadsafe(pieces.put_nowait, None)
+
+        producer = loop.run_in_executor(self.executor, produce)
+        try:
+            writer.write(self._head(200, "application/x-ndjson", keep_alive, {"Transfer-Encoding": "chunked"}))
+            while True:
+                item = await pieces.get()
+                line = json.dumps({"done": True} if item is None else item, ensure_ascii=False).encode("utf-8") + b"\n"
+                writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+                await writer.drain()
+                if item is None:
+                    break
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        except BaseException:
+            disconnected.set()
+            raise
+        await producer
+
+    def _head(self, status: int, content_type: str, keep_alive: bool, extra: Optional[Dict[str, str]] = None) -> bytes:
+        headers = {
+            "Content-Type": f"{content_type}; charset=utf-8",
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        if keep_alive:
+            headers["Keep-Alive"] = f"timeout={int(self.config.keepalive_timeout)}"
+        headers.update(extra or {})
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"] + [f"{k}: {v}" for k, v in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(self._head(status, "application/json", keep_alive, {"Content-Length": str(len(body))}) + body)
+        await writer.drain()
+
+def start_in_background(config: Optional[ApiConfig] = None) -> ApiServer:
+    """Run the API on its own event loop thread in this process; returns once it is listening"""
+    server = ApiServer(config or get_config().api)
+    started = threading.Event()
+    failure = []
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(server.start())
+        except Exception as e:
+            failure.append(e)
+            return
+        finally:
+            started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="api-server", daemon=True).start()
+    started.wait()
+    if failure:
+        raise failure[0]
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Binondo Heritage Guide JSON API")
+    config = get_config().api
+    parser.add_argument("--host", default=config.host)
+    parser.add_argument("--port", type=int, default=config.port)
+    parser.add_argument("--max-concurrency", type=int, default=config.max_concurrency)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = replace(config, host=args.host, port=args.port, max_concurrency=args.max_concurrency)
+    asyncio.run(ApiServer(config).serve_forever())
+
+if __name__ == "__main__":
+    main()
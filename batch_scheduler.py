@@ -0,0 +1,119 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class MicroBatchScheduler:
+    """Collects requests from concurrent sessions into batches for one worker thread.
+
+    The worker blocks until a request arrives, then keeps collecting until
+    max_batch_size requests are pending or max_wait_ms has passed since the
+    first one, and hands the whole batch to process_batch. Each caller gets
+    its own result back through a Future.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0, name: str = "micro-batcher"):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batch_sizes: Counter = Counter()
+        self.queue_depths: Counter = Counter()
+        self.items = 0
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        """Queue one request; the Future resolves to its result"""
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def run(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit one request and wait for its result; on timeout it is withdrawn if not started yet"""
+        future = self.submit(item)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def queue_depth(self) -> int:
+        """Requests waiting for the worker right now"""
+        return self._queue.qsize()
+
+    def _collect(self) -> Optional[List[tuple]]:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            with self._stats_lock:
+                self.batch_sizes[len(batch)] += 1
+                self.queue_depths[self._queue.qsize()] += 1
+                self.items += len(batch)
+
+            # drop requests whose caller already gave up
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.process_batch([item for item, _ in batch])
+            except Exception as e:
+                logger.warning(f"Batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            if len(results) != len(batch):
+                error = RuntimeError(f"Batch of {len(batch)} returned {len(results)} results")
+                logger.warning(str(error))
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size and queue-depth histograms plus totals"""
+        with self._stats_lock:
+            batches = sum(self.batch_sizes.values())
+            return {
+                "batches": batches,
+                "items": self.items,
+                "mean_batch_size": self.items / batches if batches else 0.0,
+                "queue_depth": self._queue.qsize(),
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+                "queue_depth_histogram": dict(sorted(self.queue_depths.items()))
+            }
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """Stop the worker once the requests queued so far are handled"""
+        self._queue.put(None)
+        self._worker.join(timeout)
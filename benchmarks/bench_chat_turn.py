@@ -0,0 +1,75 @@
+"""Chat turn benchmark: wall time and script executions per submitted message.
+
+Drives app.py through Streamlit's AppTest harness, submits a sequence of
+keyword-routed questions and reports how long each turn took and how many
+times the script (or chat fragment) ran for it.
+
+    python benchmarks/bench_chat_turn.py --turns 20
+    python benchmarks/bench_chat_turn.py --app /tmp/app_before.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from streamlit.runtime.scriptrunner import script_runner
+from streamlit.testing.v1 import AppTest
+
+QUESTIONS = [
+    "Give me food spots in Binondo",
+    "What are Binondo's heritage sites?",
+    "Tell me about cultural festivals",
+    "How did Binondo become the oldest Chinatown?",
+    "Tell me about Binondo Church",
+    "What is the history of Eng Bee Tin?",
+]
+
+# every pass through the script (an st.rerun() starts another one) goes through this call
+script_runs = 0
+_exec_func = script_runner.exec_func_with_error_handling
+
+def _counting_exec_func(*args, **kwargs):
+    global script_runs
+    script_runs += 1
+    return _exec_func(*args, **kwargs)
+
+script_runner.exec_func_with_error_handling = _counting_exec_func
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def main():
+    global script_runs
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--app", default="app.py", help="script to drive, e.g. an older copy of app.py")
+    args = parser.parse_args()
+
+    at = AppTest.from_file(os.path.abspath(args.app), default_timeout=120)
+    at.run()
+    # one throwaway turn so route tables and caches are warm
+    at.chat_input[0].set_value(QUESTIONS[0]).run()
+
+    times, runs = [], []
+    for turn in range(args.turns):
+        script_runs = 0
+        start = time.perf_counter()
+        at.chat_input[0].set_value(QUESTIONS[turn % len(QUESTIONS)]).run()
+        times.append((time.perf_counter() - start) * 1000)
+        runs.append(script_runs)
+    if at.exception:
+        raise SystemExit(f"app raised: {at.exception}")
+
+    print(f"{args.app}: {args.turns} turns")
+    print(f"  script runs per turn  {statistics.mean(runs):.1f}")
+    print(f"  wall time per turn    p50 {statistics.median(times):.1f}ms  p95 {percentile(times, 95):.1f}ms"
+          f"  mean {statistics.mean(times):.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Embedding throughput on CPU for different batch sizes.
+
+Runs with the disk cache disabled so every text is actually embedded, then
+replays the corpus through a cached engine to show the warm-cache rate.
+
+    python benchmarks/bench_embeddings.py --texts 512
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_config
+from embedding_engine import EmbeddingEngine
+from knowledge import iter_knowledge_documents
+
+def build_corpus(size: int) -> list:
+    """Knowledge documents split into lines, numbered so every text is distinct"""
+    lines = [line for _, text, _ in iter_knowledge_documents() for line in text.splitlines()]
+    return [f"{lines[i % len(lines)]} ({i})" for i in range(size)]
+
+def throughput(engine: EmbeddingEngine, texts: list) -> float:
+    """Embeddings per second for one pass over the texts"""
+    start = time.perf_counter()
+    engine.embed(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    model_name = get_config().embedding.model_name
+    corpus = build_corpus(args.texts)
+
+    print(f"{model_name} on CPU, {len(corpus)} texts")
+    print(f"{'batch':>6}{'cold emb/s':>12}{'cached emb/s':>14}")
+    for batch_size in args.batch_sizes:
+        engine = EmbeddingEngine(model_name, batch_size=batch_size, device="cpu")
+        engine.embed(corpus[:batch_size])  # load the model outside the timed pass
+        cold = throughput(engine, corpus)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cached_engine = EmbeddingEngine(model_name, batch_size=batch_size, cache_dir=cache_dir, device="cpu")
+            cached_engine._model = engine.model
+            cached_engine.embed(corpus)
+            warm = throughput(cached_engine, corpus)
+
+        print(f"{batch_size:>6}{cold:>12.1f}{warm:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Micro-benchmark: Aho-Corasick entity matcher against the linear substring scan.
+
+    python benchmarks/bench_entity_matcher.py
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_matcher import EntityMatcher
+from knowledge import ENTITY_MAPPING
+
+SYLLABLES = ["ban", "chi", "dong", "eng", "fu", "hua", "jin", "kim", "lao", "mei",
+             "ngo", "ong", "pin", "qing", "san", "tan", "uy", "wei", "xin", "yap", "zhu"]
+SUFFIXES = ["street", "bakery", "deli", "noodle house", "tea house", "trading", "pharmacy"]
+
+QUERIES = [
+    "What is the history of Eng Bee Tin?",
+    "Tell me about the history of Binondo Church",
+    "Where can I find traditional Chinese medicine shops on Ongpin Street?",
+    "What traditional foods should I try in Binondo besides hopia and tikoy?",
+    "How has Binondo preserved its heritage over 400+ years?",
+]
+
+def synthetic_mapping(size: int, seed: int = 124) -> dict:
+    """Real entity names padded with generated shop, street and dish names"""
+    rng = random.Random(seed)
+    mapping = dict(list(ENTITY_MAPPING.items())[:size])
+    while len(mapping) < size:
+        name = " ".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+        name = f"{name} {rng.choice(SUFFIXES)}"
+        mapping[name] = name.replace(" ", "_")
+    return mapping
+
+def linear_scan(mapping: dict, query: str) -> list:
+    """The original extract_entities loop"""
+    query_lower = query.lower()
+    return [(name, key) for name, key in mapping.items() if name in query_lower]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[20, 2000, 50000])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'entities':>9}{'build':>11}{'linear/query':>15}{'automaton/query':>18}{'speedup':>9}")
+    for size in args.sizes:
+        mapping = synthetic_mapping(size)
+        build_s = timeit.timeit(lambda: EntityMatcher(mapping), number=1)
+        matcher = EntityMatcher(mapping)
+
+        calls = args.number * len(QUERIES)
+        linear_s = timeit.timeit(lambda: [linear_scan(mapping, q) for q in QUERIES], number=args.number) / calls
+        automaton_s = timeit.timeit(lambda: [matcher.match(q) for q in QUERIES], number=args.number) / calls
+
+        print(f"{size:>9}{build_s * 1e3:>9.1f}ms{linear_s * 1e6:>13.1f}us"
+              f"{automaton_s * 1e6:>16.1f}us{linear_s / automaton_s:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
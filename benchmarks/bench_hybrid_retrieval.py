@@ -0,0 +1,62 @@
+"""Hybrid retrieval benchmark: per-stage latency and status counts under the
+configured latency budget.
+
+The first query pays the one-off costs (keyword index build, embedding model
+load); a vector stage still loading is reported as timeout/busy instead of
+delaying the reply.
+
+    python benchmarks/bench_hybrid_retrieval.py --rounds 20
+"""
+import argparse
+import os
+import statistics
+import sys
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from retrieval import get_hybrid_retriever
+
+QUERIES = [
+    "Where can I find traditional Chinese medicine shops?",
+    "dumplings and noodles near Ongpin",
+    "Tell me about the Binondo Church altar",
+    "mooncake festival traditions",
+    "Is it calm at dusk?",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    retriever = get_hybrid_retriever()
+    first = retriever.retrieve(QUERIES[0])
+    print(f"first query: {first.total_ms:.1f}ms "
+          + ", ".join(f"{t.stage} {t.status}" for t in first.timings))
+
+    stage_ms = defaultdict(list)
+    statuses = defaultdict(Counter)
+    totals = []
+    for _ in range(args.rounds):
+        for query in QUERIES:
+            result = retriever.retrieve(query)
+            totals.append(result.total_ms)
+            for timing in result.timings:
+                statuses[timing.stage][timing.status] += 1
+                if timing.status in ("ok", "empty"):
+                    stage_ms[timing.stage].append(timing.elapsed_ms)
+
+    print(f"\nbudget {retriever.budget_ms:.0f}ms, {len(totals)} queries")
+    print(f"{'stage':<12}{'p50 ms':>9}{'max ms':>9}  statuses")
+    for stage, counts in statuses.items():
+        times = stage_ms[stage]
+        p50 = f"{statistics.median(times):.2f}" if times else "-"
+        worst = f"{max(times):.2f}" if times else "-"
+        print(f"{stage:<12}{p50:>9}{worst:>9}  {dict(counts)}")
+    print(f"{'total':<12}{statistics.median(totals):>9.2f}{max(totals):>9.2f}")
+
+if __name__ == "__main__":
+    main()
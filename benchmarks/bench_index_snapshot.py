@@ -0,0 +1,78 @@
+"""Index open time against corpus size: the mmap snapshot against a
+vectors.npy plus chunks.json layout, on synthetic corpora.
+
+Opening a snapshot reads only its header, so its time should stay flat as the
+corpus grows, while chunks.json is parsed in full. The first search after
+opening is timed too, since a lazy format can move the cost there.
+
+    python benchmarks/bench_index_snapshot.py
+    python benchmarks/bench_index_snapshot.py --sizes 1000 100000 --dim 384
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_index import NumpyVectorIndex, normalize_rows
+
+CHUNK = "Binondo Church, also known as the Minor Basilica of San Lorenzo Ruiz, was founded in 1596. " * 6
+
+def write_legacy(path: str, index: NumpyVectorIndex):
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "vectors.npy"), index.matrix)
+    with open(os.path.join(path, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump({"ids": index.ids, "texts": index.texts, "metadatas": index.metadatas}, f)
+
+def load_legacy(path: str) -> NumpyVectorIndex:
+    matrix = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+    with open(os.path.join(path, "chunks.json"), "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    return NumpyVectorIndex(matrix, chunks["texts"], chunks["metadatas"], chunks["ids"], normalized=True)
+
+def timed_open(load, path: str, query: np.ndarray, repeats: int):
+    opens, searches = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        index = load(path)
+        opened = time.perf_counter()
+        index.search(query, 3)
+        searches.append(time.perf_counter() - opened)
+        opens.append(opened - start)
+    return min(opens) * 1000, min(searches) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'chunks':>8}{'file MB':>9}{'open ms':>10}{'search ms':>11}"
+          f"{'npy+json MB':>13}{'open ms':>10}{'search ms':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            vectors = normalize_rows(rng.standard_normal((size, args.dim)))
+            index = NumpyVectorIndex(vectors, [f"{i}. {CHUNK}" for i in range(size)],
+                                     [{"source": f"doc-{i % 50}.txt", "chunk": i} for i in range(size)],
+                                     [f"chunk-{i}" for i in range(size)], normalized=True)
+            snapshot_path = os.path.join(directory, f"snapshot-{size}")
+            legacy_path = os.path.join(directory, f"legacy-{size}")
+            index.save(snapshot_path)
+            write_legacy(legacy_path, index)
+
+            sizes = [sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)) / 2 ** 20
+                     for path in (snapshot_path, legacy_path)]
+            snapshot_open, snapshot_search = timed_open(NumpyVectorIndex.load, snapshot_path, vectors[0], args.repeats)
+            legacy_open, legacy_search = timed_open(load_legacy, legacy_path, vectors[0], args.repeats)
+            print(f"{size:>8}{sizes[0]:>9.1f}{snapshot_open:>10.2f}{snapshot_search:>11.2f}"
+                  f"{sizes[1]:>13.1f}{legacy_open:>10.2f}{legacy_search:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Intent routing micro-benchmark: compiled intent index against the original
+chained any(...) keyword ladders. Routing itself is checked by
+tests/test_intent_router.py.
+
+    python benchmarks/bench_intent_router.py
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import INTENT_INDEX, Intent, QUERY_TYPE_KEYWORDS, TOPIC_KEYWORDS
+from utils import get_suggested_questions
+
+MISSES = [
+    "Is there parking nearby?",
+    "Can you recommend a hotel?",
+]
+
+def legacy_classify(query: str) -> Intent:
+    """The substring ladders the original determine_query_type and get_relevant_info used"""
+    query_lower = query.lower()
+    query_type = "general"
+    for name, keywords in QUERY_TYPE_KEYWORDS:
+        if any(word in query_lower for word in keywords):
+            query_type = name
+            break
+    topic = None
+    for name, keywords in TOPIC_KEYWORDS:
+        if any(word in query_lower for word in keywords):
+            topic = name
+            break
+    return Intent(query_type, topic)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    workloads = {"suggested": get_suggested_questions(), "misses": MISSES}
+    print(f"{'workload':<12}{'ladder/query':>14}{'index/query':>14}")
+    for name, queries in workloads.items():
+        calls = args.number * len(queries)
+        ladder_s = timeit.timeit(lambda: [legacy_classify(q) for q in queries], number=args.number) / calls
+        index_s = timeit.timeit(lambda: [INTENT_INDEX.classify(q) for q in queries], number=args.number) / calls
+        print(f"{name:<12}{ladder_s * 1e6:>12.1f}us{index_s * 1e6:>12.1f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Interaction log benchmark: caller-side cost of record() against a
+synchronous logging.FileHandler write, and how many events a burst larger
+than the queue drops under each overflow policy.
+
+    python benchmarks/bench_interaction_log.py
+    python benchmarks/bench_interaction_log.py --events 20000 --max-queue 256
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interaction_log import InteractionLog
+
+EVENT = {
+    "timestamp": 0.0,
+    "source": "bench",
+    "session": "0" * 32,
+    "query": "What is the history of Eng Bee Tin?",
+    "response": "🥟 **The Rich History of Eng Bee Tin** " * 12,
+    "response_length": 480,
+    "latency_ms": 1.5,
+    "cache_hit": False,
+}
+
+def percentile_us(timings, pct):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] * 1e6
+
+def sync_logging(path: str, events: int):
+    logger = logging.getLogger("bench_interaction_log")
+    logger.propagate = False
+    handler = logging.FileHandler(path, encoding="utf-8")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    timings = []
+    for _ in range(events):
+        start = time.perf_counter()
+        logger.info(f"User Query: {EVENT['query'][:100]}...")
+        logger.info(f"Bot Response Length: {EVENT['response_length']} characters")
+        timings.append(time.perf_counter() - start)
+    logger.removeHandler(handler)
+    handler.close()
+    return timings
+
+def queued_logging(path: str, events: int, max_queue: int, overflow: str):
+    log = InteractionLog(path, max_queue=max_queue, overflow=overflow, flush_interval=0.05)
+    timings = []
+    for _ in range(events):
+        start = time.perf_counter()
+        log.record(EVENT)
+        timings.append(time.perf_counter() - start)
+    log.close()
+    return timings, log.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--max-queue", type=int, default=1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'sink':<28}{'p50 us':>9}{'p99 us':>9}{'max us':>10}{'written':>9}{'dropped':>9}")
+        timings = sync_logging(os.path.join(directory, "sync.log"), args.events)
+        print(f"{'logging.FileHandler':<28}{percentile_us(timings, 50):>9.1f}{percentile_us(timings, 99):>9.1f}"
+              f"{max(timings) * 1e6:>10.0f}{args.events:>9}{0:>9}")
+        for overflow in ("drop", "block"):
+            path = os.path.join(directory, f"{overflow}.jsonl")
+            timings, stats = queued_logging(path, args.events, args.max_queue, overflow)
+            print(f"{'InteractionLog (' + overflow + ')':<28}{percentile_us(timings, 50):>9.1f}"
+                  f"{percentile_us(timings, 99):>9.1f}{max(timings) * 1e6:>10.0f}"
+                  f"{stats['written']:>9}{stats['dropped']:>9}")
+
+if __name__ == "__main__":
+    main()
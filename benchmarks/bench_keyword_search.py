@@ -0,0 +1,48 @@
+"""Micro-benchmark: FTS5 keyword search latency over the knowledge base.
+
+    python benchmarks/bench_keyword_search.py --repeat 1000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_index import KeywordIndex
+
+QUERIES = [
+    "Where can I find traditional Chinese medicine shops?",
+    "dumplings and noodles",
+    "gold jewelry craftsmanship",
+    "mooncake festival",
+    "art deco buildings",
+    "Is it calm at dusk?",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        index = KeywordIndex(os.path.join(tmp, "keyword_index.sqlite3"))
+        print(f"build: {(time.perf_counter() - start) * 1000:.1f}ms for {len(index)} entities\n")
+
+        print(f"{'query':<56}{'p50 us':>9}{'p99 us':>9}  top hit")
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                hits = index.search(query)
+                timings.append((time.perf_counter() - t0) * 1e6)
+            timings.sort()
+            top = hits[0].id if hits else "-"
+            print(f"{query:<56}{statistics.median(timings):>9.1f}{timings[int(len(timings) * 0.99)]:>9.1f}  {top}")
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Micro-benchmark: loading the knowledge data file against importing the old
+nested BINONDO_KNOWLEDGE literal, and store lookups against chained dict probes.
+
+The literal is rebuilt from the data file, so both sides hold the same content.
+"Import (source)" is a first import that compiles knowledge.py; "import (pyc)"
+is a later one that unmarshals the cached bytecode.
+
+    python benchmarks/bench_knowledge_store.py
+"""
+import argparse
+import marshal
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge import KNOWLEDGE_PATH, KNOWLEDGE_STORE, ENTITY_MAPPING, KnowledgeStore
+
+def nested_knowledge(store: KnowledgeStore) -> dict:
+    """The old nested dict layout, rebuilt from the entity paths"""
+    nested: dict = {}
+    for entity in store:
+        node = nested
+        for part in entity.path[:-1]:
+            node = node.setdefault(part, {})
+        node.setdefault(entity.path[-1], {}).update(entity.fields)
+    return nested
+
+def chained_lookup(knowledge: dict, entity_key: str):
+    """The original get_entity_info probe order"""
+    if entity_key in knowledge["food_spots"]:
+        return knowledge["food_spots"][entity_key]
+    elif entity_key in knowledge["heritage_sites"]:
+        return knowledge["heritage_sites"][entity_key]
+    elif entity_key in knowledge["food_spots"]["traditional_foods"]:
+        return knowledge["food_spots"]["traditional_foods"][entity_key]
+    return None
+
+def best_us(stmt, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    knowledge = nested_knowledge(KNOWLEDGE_STORE)
+    source = f"BINONDO_KNOWLEDGE = {knowledge!r}\n"
+    bytecode = marshal.dumps(compile(source, "knowledge_literal.py", "exec"))
+
+    def import_source():
+        exec(compile(source, "knowledge_literal.py", "exec"), {})
+
+    def import_pyc():
+        exec(marshal.loads(bytecode), {})
+
+    print(f"{len(KNOWLEDGE_STORE)} entities, {os.path.getsize(KNOWLEDGE_PATH)} byte data file")
+    print(f"{'load':<28}{'us':>10}")
+    print(f"{'literal import (source)':<28}{best_us(import_source, args.number):>10.1f}")
+    print(f"{'literal import (pyc)':<28}{best_us(import_pyc, args.number):>10.1f}")
+    print(f"{'KnowledgeStore.load':<28}{best_us(KnowledgeStore.load, args.number):>10.1f}")
+
+    keys = list(dict.fromkeys(ENTITY_MAPPING.values()))
+    lookups = args.number * 100
+    chained = best_us(lambda: [chained_lookup(knowledge, key) for key in keys], lookups) / len(keys)
+    store = best_us(lambda: [KNOWLEDGE_STORE.get(key) for key in keys], lookups) / len(keys)
+    print(f"\n{'lookup per entity':<28}{'ns':>10}")
+    print(f"{'chained dict probes':<28}{chained * 1000:>10.0f}")
+    print(f"{'KnowledgeStore.get':<28}{store * 1000:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Load test for the chat pipeline: latency percentiles per stage, throughput
+at N concurrent workers and peak memory, saved as a JSON baseline.
+
+The workload mixes the sidebar's suggested questions, paraphrases of them and
+out-of-domain questions. Every stage is timed on its own (keyword routes,
+full-text search, vector/hybrid retrieval, the whole get_relevant_info) so a
+regression points at the stage that caused it. Runs offline on CPU; when the
+embedding model is not available locally, the stages that need it (retrieval,
+get_relevant_info and the concurrency runs) are still timed, on the keyword
+and lexical fallback the app serves then, and labelled "degraded" so they are
+never compared against a full-pipeline baseline.
+
+    python benchmarks/bench_pipeline.py --workers 1 2 4 8
+    python benchmarks/bench_pipeline.py --save benchmarks/results/pipeline_baseline.json
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline_baseline.json
+"""
+import os
+
+# offline and CPU-only before anything imports torch or huggingface_hub
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import chatbot
+from config import get_config
+from retrieval import get_embedding_model, keyword_search, relevant_chunks
+from utils import get_suggested_questions
+
+PARAPHRASES = [
+    "history of binondo church",
+    "which heritage sites should I visit in binondo",
+    "traditional binondo food to try",
+    "why is binondo the oldest chinatown in the world",
+    "festivals celebrated in binondo",
+    "chinese medicine shops binondo where",
+    "why is escolta street significant",
+    "who was saint lorenzo ruiz",
+    "eng bee tin history",
+    "history of engbeetin",
+]
+
+OUT_OF_DOMAIN = [
+    "What's the weather in Tokyo tomorrow?",
+    "How do I reset my router?",
+    "Is it calm at dusk?",
+    "Recommend a good laptop for programming",
+    "What is the capital of Australia?",
+]
+
+# stages whose open-ended queries go through the embedding model
+EMBEDDING_STAGES = ("retrieval", "get_relevant_info")
+
+STAGES: Dict[str, Callable[[str], object]] = {
+    "keyword_routes": chatbot.get_keyword_response,
+    "keyword_search": keyword_search,
+    "retrieval": relevant_chunks,
+    "get_relevant_info": chatbot.get_relevant_info,
+}
+
+def embedding_probe():
+    """Raise if the embedding model cannot be loaded; relevant_chunks would hide that behind the fallback"""
+    get_embedding_model().embed_query("probe")
+
+def default_workload() -> Dict[str, List[str]]:
+    return {
+        "suggested": get_suggested_questions(),
+        "paraphrase": PARAPHRASES,
+        "out_of_domain": OUT_OF_DOMAIN,
+    }
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def latency_stats(timings_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings_ms)
+    return {
+        "p50_ms": percentile(ordered, 50),
+        "p95_ms": percentile(ordered, 95),
+        "p99_ms": percentile(ordered, 99),
+        "mean_ms": sum(ordered) / len(ordered) if ordered else 0.0,
+    }
+
+def run_stage(stage: Callable[[str], object], queries: List[str], repeat: int) -> Dict[str, float]:
+    """Time one stage over the workload on a single thread"""
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            stage(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return latency_stats(timings)
+
+def run_concurrent(stage: Callable[[str], object], queries: List[str], repeat: int, workers: int) -> Dict[str, float]:
+    """Throughput and latency with `workers` threads pulling from the same request list"""
+    requests = queries * repeat
+    timings = []
+
+    def timed(query):
+        start = time.perf_counter()
+        stage(query)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(timed, requests))
+    wall = time.perf_counter() - start
+    return dict(latency_stats(timings), throughput_rps=len(requests) / wall)
+
+def compare(report: Dict, baseline: Dict):
+    """Print the change of every latency and throughput figure against a baseline run in the same mode"""
+    print(f"\n{'metric':<52}{'baseline':>12}{'now':>12}{'change':>10}")
+    for section in ("stages", "concurrency"):
+        for name, stats in report[section].items():
+            old_stats = baseline.get(section, {}).get(name)
+            if not isinstance(stats, dict) or not isinstance(old_stats, dict):
+                continue
+            if stats.get("mode") != old_stats.get("mode"):
+                print(f"{section + '.' + name:<52}{old_stats.get('mode', '?'):>12}{stats.get('mode', '?'):>12}"
+                      f"{'not comparable':>16}")
+                continue
+            for metric, value in stats.items():
+                old = old_stats.get(metric)
+                if not isinstance(old, (int, float)) or not old:
+                    continue
+                change = (value - old) / old
+                print(f"{section + '.' + name + '.' + metric:<52}{old:>12.2f}{value:>12.2f}{change:>+10.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workload", help="JSON file of {group: [queries]}; defaults to the built-in mix")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--save", help="write the report as a JSON baseline")
+    parser.add_argument("--compare", help="diff against a saved baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.workload:
+        with open(args.workload, "r", encoding="utf-8") as f:
+            workload = json.load(f)
+    else:
+        workload = default_workload()
+    queries = [query for group in workload.values() for query in group]
+
+    start = time.perf_counter()
+    chatbot.sync_knowledge()
+    report = {
+        "environment": {"python": platform.python_version(), "machine": platform.machine(),
+                        "cpus": os.cpu_count()},
+        "workload": {group: len(group_queries) for group, group_queries in workload.items()},
+        "repeat": args.repeat,
+        "warm_caches_ms": (time.perf_counter() - start) * 1000,
+        "stages": {},
+        "concurrency": {},
+    }
+
+    degraded = None
+    config = get_config()
+    if config.enable_retrieval or config.semantic_cache_enabled:
+        try:
+            embedding_probe()
+        except Exception as e:
+            degraded = f"embedding model unavailable: {e}"
+    report["degraded"] = degraded
+
+    def mode(name: str) -> str:
+        return "degraded" if degraded and name in EMBEDDING_STAGES else "full"
+
+    for name in args.stages:
+        stage = STAGES[name]
+        try:
+            # first pass loads indexes and models and fills caches; it is reported separately
+            first = time.perf_counter()
+            for query in queries:
+                stage(query)
+            first_pass_ms = (time.perf_counter() - first) * 1000
+        except Exception as e:
+            report["stages"][name] = f"skipped: {e}"
+            continue
+        report["stages"][name] = dict(run_stage(stage, queries, args.repeat), first_pass_ms=first_pass_ms,
+                                      mode=mode(name))
+
+    for workers in args.workers:
+        report["concurrency"][f"{workers}_workers"] = dict(
+            run_concurrent(chatbot.get_relevant_info, queries, args.repeat, workers), mode=mode("get_relevant_info")
+        )
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    print(f"{len(queries)} queries x {args.repeat}, cache warm-up {report['warm_caches_ms']:.1f}ms, "
+          f"peak RSS {report['peak_rss_mb']:.0f} MB")
+    if degraded:
+        print(f"degraded: {degraded}")
+    print(f"\n{'stage':<20}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'first pass ms':>15}{'mode':>10}")
+    for name, stats in report["stages"].items():
+        if isinstance(stats, str):
+            print(f"{name:<20}{stats}")
+            continue
+        print(f"{name:<20}{stats['p50_ms']:>9.3f}{stats['p95_ms']:>9.3f}{stats['p99_ms']:>9.3f}"
+              f"{stats['first_pass_ms']:>15.1f}{stats['mode']:>10}")
+    print(f"\n{'get_relevant_info':<20}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'mode':>10}")
+    for name, stats in report["concurrency"].items():
+        print(f"{name:<20}{stats['throughput_rps']:>10.0f}{stats['p50_ms']:>9.3f}{stats['p99_ms']:>9.3f}"
+              f"{stats['mode']:>10}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nbaseline written to {args.save}")
+
+if __name__ == "__main__":
+    main()
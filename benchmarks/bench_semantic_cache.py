@@ -0,0 +1,65 @@
+"""Semantic answer cache benchmark: lookup latency by cache size, and the hit
+rate on paraphrased questions with the configured embedding model.
+
+    python benchmarks/bench_semantic_cache.py
+    python benchmarks/bench_semantic_cache.py --threshold 0.85
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticAnswerCache
+
+# (cached question, paraphrase) pairs
+PARAPHRASES = [
+    ("Eng Bee Tin history", "history of engbeetin"),
+    ("Where can I buy hopia in Binondo?", "where to get hopia in binondo"),
+    ("What is there to see on Escolta?", "things to see along Escolta Street"),
+    ("How old is Binondo?", "how many years old is binondo"),
+    ("Is Binondo Church worth visiting?", "should I visit Binondo church"),
+]
+# questions that must not hit any cached answer
+UNRELATED = ["What time do the gold shops open?", "Which festival has dragon dances?"]
+
+def lookup_latency(sizes, dim: int = 384):
+    rng = np.random.default_rng(124)
+    print(f"{'entries':>8}{'lookup us':>12}")
+    for size in sizes:
+        cache = SemanticAnswerCache(max_size=size)
+        for i in range(size):
+            cache.put(rng.normal(size=dim), f"answer {i}")
+        query = rng.normal(size=dim)
+        seconds = min(timeit.repeat(lambda: cache.get(query), number=200, repeat=5)) / 200
+        print(f"{size:>8}{seconds * 1e6:>12.1f}")
+
+def paraphrase_hit_rate(threshold: float):
+    from embedding_engine import create_embedding_engine
+    engine = create_embedding_engine()
+    cache = SemanticAnswerCache(threshold=threshold)
+    for question, _ in PARAPHRASES:
+        cache.put(engine.embed_query(question), question)
+    hits = sum(cache.get(engine.embed_query(p)) == q for q, p in PARAPHRASES)
+    false_hits = sum(cache.get(engine.embed_query(q)) is not None for q in UNRELATED)
+    print(f"\nthreshold {threshold}: {hits}/{len(PARAPHRASES)} paraphrases hit, "
+          f"{false_hits}/{len(UNRELATED)} unrelated questions hit")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 256, 4096])
+    parser.add_argument("--threshold", type=float, default=None)
+    args = parser.parse_args()
+
+    lookup_latency(args.sizes)
+    try:
+        from config import get_config
+        paraphrase_hit_rate(args.threshold or get_config().semantic_cache_threshold)
+    except Exception as e:
+        print(f"\nskipping paraphrase hit rate, embedding model unavailable: {e}")
+
+if __name__ == "__main__":
+    main()
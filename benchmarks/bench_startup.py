@@ -0,0 +1,83 @@
+"""Startup benchmark: time-to-first-render and peak RSS for the keyword-only
+and full-text paths against the full RAG path.
+
+Each sample runs in a fresh interpreter so import costs are not shared, with
+the startup warm-up disabled.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the fulltext query matches no keyword route but hits the FTS5 index; the rag
+# query matches neither, so it falls through to vector retrieval
+QUERIES = {
+    "keyword": "What is the history of Eng Bee Tin?",
+    "fulltext": "Where can I find traditional Chinese medicine shops?",
+    "rag": "Is it calm at dusk?",
+}
+
+CHILD_SCRIPT = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+query = sys.argv[1]
+from dataclasses import replace
+from streamlit.testing.v1 import AppTest
+
+# the background warm-up loads torch and the embedding model at startup, which would hide what the
+# keyword-only and full-text paths save; modules imported by app.py pick up this get_config
+import config
+_get_config = config.get_config
+config.get_config = lambda: replace(_get_config(), warmup_enabled=False)
+
+at = AppTest.from_file("app.py", default_timeout=120)
+at.run()
+first_render = time.perf_counter() - t0
+at.chat_input[0].set_value(query).run()
+first_answer = time.perf_counter() - t0
+
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({"first_render_s": first_render, "first_answer_s": first_answer, "peak_rss_mb": rss_kb / 1024}))
+"""
+
+def run_once(mode: str) -> dict:
+    """Run one cold start in a child interpreter"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, QUERIES[mode]],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_wall_s"] = time.perf_counter() - start
+    return sample
+
+def summarize(samples: list) -> dict:
+    """Median of every metric across runs"""
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", default=list(QUERIES), choices=list(QUERIES))
+    args = parser.parse_args()
+
+    report = {}
+    for mode in args.modes:
+        report[mode] = summarize([run_once(mode) for _ in range(args.runs)])
+
+    print(f"{'path':<10}{'first render':>14}{'first answer':>14}{'process':>10}{'peak RSS':>12}")
+    for mode, stats in report.items():
+        print(f"{mode:<10}{stats['first_render_s']:>13.2f}s{stats['first_answer_s']:>13.2f}s"
+              f"{stats['process_wall_s']:>9.2f}s{stats['peak_rss_mb']:>9.0f} MB")
+
+if __name__ == "__main__":
+    main()
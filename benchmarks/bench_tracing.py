@@ -0,0 +1,68 @@
+"""Tracing overhead: cost of a span and of a traced keyword-route turn with
+tracing disabled and enabled.
+
+    python benchmarks/bench_tracing.py
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chatbot
+from tracing import TRACER, Tracer
+
+def per_call_ns(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e9
+
+def span_overhead(number: int):
+    tracer = Tracer(enabled=False)
+    traced_noop = tracer.traced("noop")(lambda: None)
+
+    def empty_span():
+        with tracer.span("stage"):
+            pass
+
+    print(f"{'':<28}{'disabled ns':>12}{'enabled ns':>12}")
+    disabled = (per_call_ns(empty_span, number), per_call_ns(traced_noop, number))
+    tracer.enabled = True
+    with tracer.turn("benchmark"):
+        enabled = (per_call_ns(empty_span, number), per_call_ns(traced_noop, number))
+    for name, off, on in zip(("with span()", "@traced call"), disabled, enabled):
+        print(f"{name:<28}{off:>12.0f}{on:>12.0f}")
+
+def turn_overhead(queries, number: int):
+    """A whole keyword-route answer with the module tracer off and on (files are not written)"""
+    chatbot.sync_knowledge()
+    tracer = TRACER
+    saved = tracer.enabled, tracer.trace_dir
+    tracer.trace_dir = None
+
+    def answer_all():
+        for query in queries:
+            with tracer.turn(query):
+                chatbot.get_relevant_info(query)
+
+    results = []
+    for enabled in (False, True):
+        tracer.enabled = enabled
+        results.append(per_call_ns(answer_all, number) / len(queries) / 1000)
+    tracer.enabled, tracer.trace_dir = saved
+    print(f"\nkeyword-route turn: {results[0]:.1f}us untraced, {results[1]:.1f}us traced "
+          f"({results[1] - results[0]:+.1f}us)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    span_overhead(args.number)
+    turn_overhead([
+        "What is the history of Eng Bee Tin?",
+        "Tell me about food spots in Binondo",
+        "What are the heritage sites?",
+    ], max(1, args.number // 100))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Top-k search latency: Chroma against the in-process numpy and FAISS backends.
+
+Uses the vectors in chroma_db. Pass --synthetic N to pad the corpus with
+random unit vectors and see where brute force stops being the better deal.
+
+    python benchmarks/bench_vector_store.py --queries 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import lazy_imports
+from config import get_config
+from vector_index import FaissVectorIndex, NumpyVectorIndex, normalize_rows
+
+def percentile_ms(samples: list, pct: float) -> float:
+    """Percentile of a list of second timings, in milliseconds"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000
+
+def time_search(search, queries: np.ndarray, k: int) -> list:
+    """Per-query latency of a search callable"""
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, k)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--synthetic", type=int, default=0, help="extra random vectors to add")
+    parser.add_argument("-k", type=int, default=get_config().vectorstore.search_k)
+    args = parser.parse_args()
+
+    config = get_config().vectorstore
+    persist_directory = os.path.join(ROOT, config.persist_directory)
+    base = NumpyVectorIndex.from_chroma(persist_directory, config.legacy_collection_name)
+    vectors, texts = np.asarray(base.matrix), list(base.texts)
+
+    rng = np.random.default_rng(124)
+    if args.synthetic:
+        extra = normalize_rows(rng.normal(size=(args.synthetic, base.dimension)))
+        vectors = np.vstack([vectors, extra])
+        texts += [f"synthetic {i}" for i in range(args.synthetic)]
+    queries = normalize_rows(vectors[rng.integers(0, len(vectors), args.queries)]
+                             + rng.normal(scale=0.05, size=(args.queries, base.dimension)))
+
+    backends = {
+        "numpy": NumpyVectorIndex(vectors, texts, normalized=True).search,
+        "faiss-flat": FaissVectorIndex(vectors, texts, normalized=True, index_type="flat").search,
+        "faiss-hnsw": FaissVectorIndex(vectors, texts, normalized=True, index_type="hnsw").search,
+    }
+    if not args.synthetic:
+        collection = lazy_imports.lazy_import("chromadb").PersistentClient(path=persist_directory) \
+            .get_collection(config.legacy_collection_name)
+        backends["chroma"] = lambda query, k: collection.query(query_embeddings=[query.tolist()], n_results=k)
+
+    print(f"{len(vectors)} vectors x {base.dimension} dims, {args.queries} queries, k={args.k}")
+    print(f"{'backend':<12}{'p50':>10}{'p95':>10}{'mean':>10}")
+    for name, search in backends.items():
+        samples = time_search(search, queries, args.k)
+        print(f"{name:<12}{percentile_ms(samples, 0.5):>8.3f}ms{percentile_ms(samples, 0.95):>8.3f}ms"
+              f"{statistics.mean(samples) * 1000:>8.3f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Worker-pool scaling: throughput and memory with 1, 2, 4 and 8 worker
+processes.
+
+Memory is read from /proc (Linux): RSS counts every page a worker maps,
+including the shared index and weight files; PSS splits shared pages between
+the processes mapping them, so total PSS growing by less than one RSS per
+worker is the sharing at work.
+
+    python benchmarks/bench_workers.py
+    python benchmarks/bench_workers.py --task generate --model microsoft/DialoGPT-small
+    python benchmarks/bench_workers.py --task embed --workers 1 2 4
+"""
+import os
+
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import wait
+from dataclasses import replace
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from config import get_config
+from utils import get_suggested_questions
+from worker_pool import WorkerPool, worker_answer, worker_embed, worker_generate
+
+def task_function(args):
+    if args.task == "generate":
+        model_config = replace(get_config().model, model_name=args.model or get_config().model.model_name,
+                               device="cpu")
+        return partial(worker_generate, model_config=model_config, max_new_tokens=args.max_new_tokens)
+    if args.task == "embed":
+        return worker_embed
+    return worker_answer
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] if ordered else 0.0
+
+def run(workers: int, fn, queries, requests: int):
+    pool = WorkerPool(replace(get_config().serving, workers=workers))
+    try:
+        pool.start()
+        # first call per worker loads models and opens indexes
+        for future in [pool.submit(fn, query) for query in queries[:workers * 2]]:
+            future.result()
+
+        latencies = []
+
+        def submit(query):
+            submitted = time.perf_counter()
+            future = pool.submit(fn, query)
+            future.add_done_callback(lambda _: latencies.append((time.perf_counter() - submitted) * 1000))
+            return future
+
+        start = time.perf_counter()
+        futures = [submit(queries[i % len(queries)]) for i in range(requests)]
+        wait(futures)
+        wall = time.perf_counter() - start
+        for future in futures:
+            future.result()
+
+        memory = pool.memory()
+        return {
+            "throughput_rps": requests / wall,
+            "p50_ms": percentile(latencies, 50),
+            "rss_mb": sum(m.get("rss", 0.0) for m in memory.values()),
+            "pss_mb": sum(m.get("pss", 0.0) for m in memory.values()),
+        }
+    finally:
+        pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--task", choices=["answer", "embed", "generate"], default="answer")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--model", help="generation model for --task generate")
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    fn = task_function(args)
+    queries = get_suggested_questions()
+    print(f"task {args.task}, {args.requests} requests, {os.cpu_count()} CPUs\n")
+    print(f"{'workers':>8}{'req/s':>10}{'speedup':>9}{'p50 ms':>9}{'RSS MB':>9}{'PSS MB':>9}{'PSS/worker':>12}")
+    baseline = None
+    for workers in args.workers:
+        try:
+            stats = run(workers, fn, queries, args.requests)
+        except Exception as e:
+            print(f"{workers:>8}  skipped: {e}")
+            continue
+        baseline = baseline or stats["throughput_rps"]
+        print(f"{workers:>8}{stats['throughput_rps']:>10.1f}{stats['throughput_rps'] / baseline:>8.2f}x"
+              f"{stats['p50_ms']:>9.1f}{stats['rss_mb']:>9.0f}{stats['pss_mb']:>9.0f}"
+              f"{stats['pss_mb'] / workers:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Build the binondo_heritage vector collection from the knowledge data file.
+
+Chunks are content-hashed, and only new or changed chunks are re-embedded, so
+rebuilding after a small knowledge edit skips the embedding model entirely
+for everything that did not change.
+
+    python build_index.py [--rebuild] [--dry-run] [--batch-size 32]
+"""
+import argparse
+import hashlib
+import time
+from typing import Dict, List, Optional, Tuple
+
+import lazy_imports
+from config import get_config
+from embedding_engine import create_embedding_engine
+from knowledge import iter_knowledge_documents
+from vector_index import NumpyVectorIndex
+
+def chunk_knowledge(chunk_size: int, chunk_overlap: int) -> List[Tuple[str, str, Dict]]:
+    """Split every knowledge document into (chunk_id, text, metadata) chunks"""
+    splitter = lazy_imports.get_text_splitter_class()(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = []
+    for doc_id, text, metadata in iter_knowledge_documents():
+        for i, chunk in enumerate(splitter.split_text(text)):
+            chunk_metadata = dict(metadata, chunk=i, content_hash=content_hash(chunk))
+            chunks.append((f"{doc_id}#{i}", chunk, chunk_metadata))
+    return chunks
+
+def content_hash(text: str) -> str:
+    """Stable hash of a chunk's text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def get_collection():
+    """Open (or create) the configured collection in the persisted Chroma store"""
+    config = get_config().vectorstore
+    chromadb = lazy_imports.lazy_import("chromadb")
+    client = chromadb.PersistentClient(path=config.persist_directory)
+    return client.get_or_create_collection(config.collection_name)
+
+def build_index(rebuild: bool = False, dry_run: bool = False, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Upsert changed chunks and delete stale ones; returns per-action counts"""
+    config = get_config()
+    batch_size = batch_size or config.embedding.batch_size
+    chunks = chunk_knowledge(config.embedding.chunk_size, config.embedding.chunk_overlap)
+    collection = get_collection()
+
+    existing = collection.get(include=["metadatas"])
+    existing_hashes = {
+        chunk_id: (metadata or {}).get("content_hash")
+        for chunk_id, metadata in zip(existing["ids"], existing["metadatas"])
+    }
+
+    changed = [c for c in chunks if rebuild or existing_hashes.get(c[0]) != c[2]["content_hash"]]
+    current_ids = {chunk_id for chunk_id, _, _ in chunks}
+    stale_ids = [chunk_id for chunk_id in existing_hashes if chunk_id not in current_ids]
+    counts = {
+        "added": sum(1 for c in changed if c[0] not in existing_hashes),
+        "updated": sum(1 for c in changed if c[0] in existing_hashes),
+        "deleted": len(stale_ids),
+        "unchanged": len(chunks) - len(changed),
+    }
+    if dry_run:
+        return counts
+
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+
+    if changed:
+        # the engine only loads the model when a chunk is missing from its disk cache
+        embedding_engine = create_embedding_engine()
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            collection.upsert(
+                ids=[chunk_id for chunk_id, _, _ in batch],
+                documents=[text for _, text, _ in batch],
+                metadatas=[metadata for _, _, metadata in batch],
+                embeddings=embedding_engine.embed_documents([text for _, text, _ in batch])
+            )
+
+    if changed or stale_ids:
+        # keep the in-process index export in step with the collection
+        index = NumpyVectorIndex.from_chroma(config.vectorstore.persist_directory, config.vectorstore.collection_name)
+        index.save(config.vectorstore.index_path)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="re-embed every chunk")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change")
+    parser.add_argument("--batch-size", type=int, default=None, help="defaults to EmbeddingConfig.batch_size")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = build_index(rebuild=args.rebuild, dry_run=args.dry_run, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{count} {action}" for action, count in counts.items())
+    print(f"{'Dry run' if args.dry_run else 'Index built'}: {summary} in {elapsed * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    main()
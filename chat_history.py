@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+import uuid
+import weakref
+from array import array
+from collections import deque
+from typing import List, Optional, Tuple
+
+class ChatMessage:
+    """One chat turn; slotted so long histories stay small"""
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+
+    def __getitem__(self, key: str) -> str:
+        # keeps msg["role"] / msg["content"] working for code written against dicts
+        return getattr(self, key)
+
+    def to_dict(self) -> dict:
+        return {"role": self.role, "content": self.content}
+
+class ChatHistory:
+    """Bounded chat history for one session.
+
+    The most recent `window` messages stay in memory. Older ones are appended
+    to a per-session JSONL log, and a compact table of byte offsets lets any
+    earlier range be read back without loading the whole file. The log is
+    deleted on clear() and when the history is garbage collected at the end
+    of its session.
+    """
+
+    def __init__(self, window: int = 50, spill_dir: Optional[str] = None, session_id: Optional[str] = None):
+        self.window = window
+        self.session_id = session_id or uuid.uuid4().hex
+        self.spill_path = os.path.join(spill_dir, f"{self.session_id}.jsonl") if spill_dir else None
+        self._recent: deque = deque()
+        self._offsets = array("q")
+        self._spilled = 0
+        self._lock = threading.Lock()
+        if self.spill_path:
+            weakref.finalize(self, _remove_file, self.spill_path)
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._recent)
+
+    def append(self, role: str, content: str):
+        """Add a message, spilling the oldest in-memory one if the window is full"""
+        with self._lock:
+            self._recent.append(ChatMessage(role, content))
+            while len(self._recent) > self.window:
+                self._spill(self._recent.popleft())
+
+    def _spill(self, msg: ChatMessage):
+        if self.spill_path:
+            os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+            with open(self.spill_path, "ab") as f:
+                self._offsets.append(f.tell())
+                f.write(json.dumps(msg.to_dict()).encode("utf-8") + b"\n")
+        self._spilled += 1
+
+    def _read_spilled(self, start: int, end: int) -> List[Tuple[int, ChatMessage]]:
+        # without a spill file, messages that left the window are gone
+        base = self._spilled - len(self._offsets)
+        start = max(start, base)
+        if start >= end:
+            return []
+        messages = []
+        with open(self.spill_path, "rb") as f:
+            f.seek(self._offsets[start - base])
+            for index in range(start, end):
+                record = json.loads(f.readline())
+                messages.append((index, ChatMessage(record["role"], record["content"])))
+        return messages
+
+    def messages(self, start: int, end: Optional[int] = None) -> List[Tuple[int, ChatMessage]]:
+        """(absolute index, message) pairs for [start, end), reading spilled ones from disk"""
+        with self._lock:
+            end = len(self) if end is None else min(end, len(self))
+            start = max(0, start)
+            result = self._read_spilled(start, min(end, self._spilled))
+            for index in range(max(start, self._spilled), end):
+                result.append((index, self._recent[index - self._spilled]))
+            return result
+
+    def tail_start(self, count: int) -> int:
+        """Index the last `count` messages start at, moved back one so a reply is never shown without its question"""
+        start = max(0, len(self) - count)
+        if start > 0 and self.messages(start, start + 1)[0][1].role == "assistant":
+            start -= 1
+        return start
+
+    def clear(self):
+        """Forget every message and delete the spill log"""
+        with self._lock:
+            self._recent.clear()
+            self._offsets = array("q")
+            self._spilled = 0
+            if self.spill_path and os.path.exists(self.spill_path):
+                os.remove(self.spill_path)
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,630 @@
+import logging
+import threading
+
+from answer_cache import AnswerCache
+from config import get_config
+from generation import build_prompt, generate_answer, stream_generate
+from intent_router import INTENT_INDEX, QUERY_TYPE_KEYWORDS
+from knowledge import ENTITY_MAPPING, ENTITY_MATCHER, KNOWLEDGE_STORE
+from response_cache import RESPONSE_CACHE
+from retrieval import answer_from_keyword_search, answer_from_retrieval, clean_chunk, embed_query, format_retrieved_response, relevant_chunks, reset_skipped_stages, skipped_stages
+from semantic_cache import SEMANTIC_CACHE
+from tracing import span, traced
+from worker_pool import get_worker_pool
+
+logger = logging.getLogger(__name__)
+
+# shared by every Streamlit session and API request in the process
+ANSWER_CACHE = AnswerCache(
+    max_size=get_config().answer_cache_max_size,
+    ttl_seconds=get_config().answer_cache_ttl_seconds
+)
+
+_sync_lock = threading.Lock()
+_knowledge_synced = False
+
+@traced("entity_extraction")
+def extract_entities(query):
+    """Extract specific entities from the query"""
+    return ENTITY_MATCHER.match(query)
+
+def get_entity_info(entity_key, query_type="general"):
+    """Get specific information about an entity"""
+    return RESPONSE_CACHE.get_or_render(
+        ("entity", entity_key, query_type),
+        lambda: render_entity_info(entity_key, query_type)
+    )
+
+def render_entity_info(entity_key, query_type="general"):
+    """Render the response for an entity without going through the cache"""
+    entity = KNOWLEDGE_STORE.get(entity_key)
+    format_response = ENTITY_FORMATTERS.get(entity.kind) if entity else None
+    if format_response is None:
+        return None
+    return format_response(entity.fields, entity_key, query_type)
+
+def format_specific_food_response(entity_data, entity_key, query_type):
+    """Format response for specific food establishments"""
+    name = entity_data.get("name", "")
+    
+    if query_type == "history" and entity_key == "eng_bee_tin":
+        return f"""🥟 **The Rich History of {name}**
+
+📅 **Founded in 1912** - Over 110 years of tradition!
+
+👨‍🍳 **The Founder:**
+- Started by **Guan Eng Bee**, a Chinese immigrant from Fujian province
+- Brought traditional pastry-making techniques from China to the Philippines
+- Began as a small shop serving the Binondo Chinese community
+
+🏪 **Evolution Through the Decades:**
+- **1912-1930s**: Small family bakery specializing in hopia and tikoy
+- **1940s-1960s**: Survived WWII and expanded offerings during post-war boom
+- **1970s-1990s**: Became the go-to place for Chinese New Year treats
+- **2000s-Present**: Four generations later, still family-owned with multiple branches
+
+🥮 **Cultural Impact:**
+- Helped preserve authentic Chinese baking traditions in the Philippines
+- Became central to Filipino-Chinese celebrations and festivals
+- Many recipes remain closely guarded family secrets
+- The original Binondo location is still the flagship store
+
+**Why It's Special:**
+Eng Bee Tin represents the successful preservation of Chinese culinary heritage while adapting to Filipino tastes. It's not just a bakery - it's a living piece of Binondo's history! 🏮"""
+
+    elif query_type == "food" or query_type == "general":
+        specialties = entity_data.get("specialties", [])
+        return f"""🥟 **{name} - Culinary Heritage Since {entity_data.get('established', '')}**
+
+🌟 **Famous Specialties:**
+{chr(10).join([f"- 🥮 **{specialty}**" for specialty in specialties])}
+
+📖 **What Makes It Special:**
+{entity_data.get('description', '')}
+
+🏆 **Significance:**
+{entity_data.get('significance', '')}
+
+💡 **Did You Know?**
+{entity_data.get('history', 'This establishment has been serving the Binondo community for generations, preserving traditional recipes and techniques.')}
+
+Perfect for experiencing authentic Chinese-Filipino culinary traditions! 🏮"""
+
+    else:
+        return f"""🥟 **{name}**
+
+{entity_data.get('description', '')}
+
+**Established:** {entity_data.get('established', 'Historic establishment')}
+**Significance:** {entity_data.get('significance', '')}
+**Specialties:** {', '.join(entity_data.get('specialties', []))}
+
+A true gem of Binondo's culinary heritage! 🏮"""
+
+def format_specific_site_response(entity_data, entity_key, query_type):
+    """Format response for specific heritage sites"""
+    name = entity_data.get("name", "")
+    
+    if query_type == "history":
+        return f"""🏛️ **The History of {name}**
+
+📅 **Founded:** {entity_data.get('founded', 'Historic period')}
+
+📖 **Historical Background:**
+{entity_data.get('history', entity_data.get('description', ''))}
+
+🌟 **Key Historical Points:**
+{chr(10).join([f"- {highlight}" for highlight in entity_data.get('highlights', [])])}
+
+🏗️ **Architectural Significance:**
+{entity_data.get('architecture', 'Features traditional architectural elements that reflect the cultural heritage of Binondo.')}
+
+**Why It Matters:**
+This site represents the rich cultural heritage and successful integration of Chinese and Filipino traditions in Binondo! 🏮"""
+
+    elif query_type == "architecture":
+        return f"""🏗️ **Architecture of {name}**
+
+🎨 **Architectural Style:**
+{entity_data.get('architecture', entity_data.get('description', ''))}
+
+🌟 **Notable Features:**
+{chr(10).join([f"- {highlight}" for highlight in entity_data.get('highlights', [])])}
+
+📅 **Built:** {entity_data.get('founded', 'Historic period')}
+
+**Cultural Significance:**
+The architecture reflects the unique blend of Chinese, Spanish, and Filipino influences that make Binondo special! 🏮"""
+
+    else:
+        return f"""🏛️ **{name}**
+
+📅 **Established:** {entity_data.get('founded', 'Historic period')}
+
+📖 **Description:**
+{entity_data.get('description', '')}
+
+🌟 **Highlights:**
+{chr(10).join([f"- {highlight}" for highlight in entity_data.get('highlights', [])])}
+
+**Significance:**
+{entity_data.get('significance', "An important part of Binondo's cultural heritage.")}
+
+A must-visit site to understand Binondo's rich history! 🏮"""
+
+def format_specific_traditional_food_response(entity_data, entity_key, query_type):
+    """Format response for traditional foods"""
+    food_name = entity_key.replace('_', ' ').title()
+    
+    if isinstance(entity_data, dict):
+        description = entity_data.get('description', '')
+        history = entity_data.get('history', '')
+        significance = entity_data.get('significance', '')
+    else:
+        description = entity_data
+        history = ''
+        significance = ''
+    
+    return f"""🥟 **{food_name} - Traditional Chinese-Filipino Delicacy**
+
+📖 **What It Is:**
+{description}
+
+{f"📚 **History & Origin:**{chr(10)}{history}" if history else ""}
+
+{f"🌟 **Cultural Significance:**{chr(10)}{significance}" if significance else ""}
+
+**Where to Try:**
+You can find authentic {food_name} at traditional establishments throughout Binondo, especially at Eng Bee Tin and other historic Chinese bakeries.
+
+A delicious taste of Binondo's culinary heritage! 🏮"""
+
+def get_keyword_response(query):
+    """Answer from the entity and keyword routes, or None if none of them match"""
+    entities = extract_entities(query)
+    with span("intent_routing"):
+        intent = INTENT_INDEX.classify(query)
+    
+    if entities:
+        entity_name, entity_key = entities[0]  
+        with span("formatting", entity=entity_key):
+            specific_response = get_entity_info(entity_key, intent.query_type)
+        if specific_response:
+            return specific_response
+    
+    if intent.topic in TOPIC_RESPONSES:
+        with span("formatting", topic=intent.topic):
+            return RESPONSE_CACHE.get_or_render((intent.topic, None, None), TOPIC_RESPONSES[intent.topic])
+    
+    return None
+
+def get_relevant_info(query):
+    """Enhanced function to get relevant information based on query"""
+    keyword_response = get_keyword_response(query)
+    if keyword_response:
+        return keyword_response
+    
+    config = get_config()
+    # full-text search is cheap enough to try before any embedding or generation work;
+    # hybrid mode runs it as one of its fused stages instead
+    if config.enable_keyword_search and config.retrieval_mode != "hybrid":
+        with span("retrieval", stage="fulltext"):
+            keyword_search_response = answer_from_keyword_search(query)
+        if keyword_search_response:
+            return keyword_search_response
+    
+    # paraphrases of an earlier open-ended question reuse its answer
+    query_embedding = cached_response = None
+    if config.semantic_cache_enabled:
+        with span("semantic_cache") as cache_span:
+            query_embedding = embed_query(query)
+            cached_response = SEMANTIC_CACHE.get(query_embedding) if query_embedding is not None else None
+            cache_span.set(hit=cached_response is not None)
+        if cached_response:
+            return cached_response
+    
+    open_ended_response = get_open_ended_answer(query)
+    if open_ended_response:
+        if query_embedding is not None and not skipped_stages():
+            SEMANTIC_CACHE.put(query_embedding, open_ended_response)
+        return open_ended_response
+    
+    return RESPONSE_CACHE.get_or_render(("default", None, None), format_default_response)
+
+def get_open_ended_answer(query):
+    """Answer a query no keyword route matched by generation or retrieval, or None"""
+    config = get_config()
+    if config.model.enable_generation:
+        # concurrent sessions share batched forward passes through the generation scheduler
+        with span("retrieval", stage=config.retrieval_mode):
+            chunks = relevant_chunks(query) if config.enable_retrieval else []
+        with span("generation"):
+            generated_response = generate_answer(build_prompt(query, [clean_chunk(text) for text, _ in chunks]))
+        if generated_response:
+            return generated_response
+    
+    # nothing matched the keyword routes, so search the vector store before giving up
+    if config.enable_retrieval:
+        with span("retrieval", stage=config.retrieval_mode):
+            retrieved_response = answer_from_retrieval(query)
+        if retrieved_response:
+            return retrieved_response
+    
+    return None
+
+def compute_answer(query):
+    """(answer, complete) for a query, complete being False if a retrieval stage was skipped"""
+    reset_skipped_stages()
+    answer = get_relevant_info(query)
+    return answer, not skipped_stages()
+
+def answer_query(query):
+    """Answer a query, reusing answers computed by any session; misses go to the worker pool when one is configured"""
+    answer = ANSWER_CACHE.get(query)
+    if answer is None:
+        pool = get_worker_pool()
+        answer, complete = pool.answer(query) if pool else compute_answer(query)
+        # a degraded answer is served once, the next ask retries the skipped stage
+        if complete:
+            ANSWER_CACHE.put(query, answer)
+    return answer
+
+def stream_answer(query):
+    """Yield the reply to a query, streaming generated tokens for open-ended questions"""
+    answer_cache = ANSWER_CACHE
+    response = answer_cache.get(query) or get_keyword_response(query)
+    config = get_config()
+    if not response and config.enable_keyword_search and config.retrieval_mode != "hybrid":
+        with span("retrieval", stage="fulltext"):
+            response = answer_from_keyword_search(query)
+    if response:
+        answer_cache.put(query, response)
+        yield response
+        return
+    
+    query_embedding = None
+    if config.semantic_cache_enabled:
+        with span("semantic_cache") as cache_span:
+            query_embedding = embed_query(query)
+            response = SEMANTIC_CACHE.get(query_embedding) if query_embedding is not None else None
+            cache_span.set(hit=response is not None)
+    if response:
+        answer_cache.put(query, response)
+        yield response
+        return
+
+    reset_skipped_stages()
+    if not config.model.enable_generation:
+        # nothing to stream, answer the way get_relevant_info would
+        response = get_open_ended_answer(query)
+        complete = not skipped_stages()
+        if response and query_embedding is not None and complete:
+            SEMANTIC_CACHE.put(query_embedding, response)
+        response = response or RESPONSE_CACHE.get_or_render(("default", None, None), format_default_response)
+        if complete:
+            answer_cache.put(query, response)
+        yield response
+        return
+
+    with span("retrieval", stage=config.retrieval_mode):
+        chunks = relevant_chunks(query) if config.enable_retrieval else []
+    pieces = []
+    failed = False
+    # covers the consumer's rendering of each token too, the stream is pulled from the UI loop
+    with span("generation", streamed=True) as generation_span:
+        try:
+            for text in stream_generate(build_prompt(query, [clean_chunk(text) for text, _ in chunks])):
+                pieces.append(text)
+                yield text
+        except Exception as e:
+            logger.warning(f"Generation failed: {e}")
+            failed = True
+        generation_span.set(pieces=len(pieces))
+
+    response = "".join(pieces).strip()
+    # a reply cut off by a failure is shown once but never cached
+    complete = not failed and not skipped_stages()
+    if not response:
+        response = format_retrieved_response(chunks) if chunks else format_default_response()
+        yield response
+    elif query_embedding is not None and complete:
+        SEMANTIC_CACHE.put(query_embedding, response)
+    if complete:
+        answer_cache.put(query, response)
+
+def format_food_response():
+    """Format response about food spots"""
+    response = """🍜 **Amazing Food Spots in Binondo!**
+
+Here are the must-visit places for authentic Chinese-Filipino cuisine:
+
+🥟 **Eng Bee Tin Chinese Deli** (Est. 1912)
+- The oldest Chinese bakery in the Philippines!
+- Famous for: Hopia (Chinese pastries) and Tikoy (rice cakes)
+- Perfect for traditional Chinese New Year treats
+
+🥢 **Dong Bei Dumplings**
+- Authentic Chinese-style dumplings
+- Fresh noodles made daily
+- Local favorite for traditional recipes
+
+🍜 **Ma Mon Luk**
+- Historic noodle house
+- Famous wonton noodles and Chinese soups
+- A Binondo institution
+
+🍽️ **Cafe Mezzanine**
+- Filipino-Chinese fusion cuisine
+- Unique blend of both culinary traditions
+- Great for experiencing cultural fusion
+
+**Traditional Foods to Try:**
+- 🥟 Hopia - Sweet or savory Chinese pastries
+- 🍰 Tikoy - Sticky rice cakes (especially during Chinese New Year)
+- 🥢 Dim Sum - Traditional small plates with tea
+- 🍖 Char Siu - Chinese roasted meats
+- 🍜 Fresh noodles and wontons
+
+The food scene here represents over 400 years of Chinese-Filipino culinary fusion! 🏮"""
+    
+    return response
+
+def format_heritage_sites_response():
+    """Format response about heritage sites"""
+    response = """🏛️ **Binondo's Amazing Heritage Sites!**
+
+Discover over 430 years of history in these iconic locations:
+
+⛪ **Binondo Church (Minor Basilica of Saint Lorenzo Ruiz)**
+- Founded: 1596 (just 2 years after Binondo!)
+- Dedicated to Saint Lorenzo Ruiz, the first Filipino saint
+- Beautiful neo-classical architecture with Chinese influences
+- Features a baroque altar with Chinese motifs
+
+🏛️ **Plaza San Lorenzo Ruiz**
+- The heart and central plaza of Binondo
+- Monument to Saint Lorenzo Ruiz (erected 1996)
+- Gathering place for community events and celebrations
+- Traditional Chinese-style landscaping
+
+🛍️ **Escolta Street - "Queen of Streets"**
+- Manila's premier shopping district (1900s-1960s)
+- Beautiful Art Deco and Neoclassical buildings
+- Currently undergoing heritage conservation
+- Featured in Filipino literature and films
+
+🏪 **Ongpin Street**
+- Main commercial artery of Binondo
+- Traditional Chinese businesses line the street
+- Gold shops, medicine stores, restaurants
+- Bustling atmosphere with Chinese signage
+
+Each site tells the story of how Chinese immigrants built their community while preserving their heritage! 🏮"""
+    
+    return response
+
+def format_cultural_response():
+    """Format response about cultural traditions"""
+    response = """🎭 **Rich Cultural Traditions of Binondo!**
+
+Experience 430+ years of living Chinese-Filipino culture:
+
+🎊 **Major Festivals:**
+- 🧧 **Chinese New Year** - Grand celebrations with dragon dances, fireworks, and traditional performances
+- 🥮 **Mooncake Festival** - Mid-Autumn celebration with family gatherings and mooncake sharing
+- 👻 **Hungry Ghost Festival** - Ancestral worship honoring deceased family members
+- 🐉 **Dragon Boat Festival** - Cultural performances and traditional foods
+
+🏪 **Traditional Businesses:**
+- 💰 **Gold Trading** - Historic center with intricate Chinese jewelry designs
+- 🌿 **Chinese Medicine** - Herbal shops with centuries-old practices and acupuncture
+- ✍️ **Calligraphy** - Traditional Chinese brush painting and custom calligraphy
+- 📜 **Paper Goods** - Ceremonial items for ancestral worship and festivals
+
+🗣️ **Living Culture:**
+- Languages: Hokkien Chinese, Filipino, and English spoken daily
+- Family businesses spanning multiple generations
+- Unique blend of Catholic faith with Chinese ancestral traditions
+- Traditional architecture mixed with modern adaptations
+
+This isn't just history - it's a living, breathing culture that continues today! 🏮"""
+    
+    return response
+
+def format_history_response():
+    """Format response about Binondo's history"""
+    response = """📚 **The Fascinating History of Binondo!**
+
+🏮 **World's Oldest Chinatown - Since 1594!**
+
+**The Beginning:**
+- Established in 1594 by the Spanish colonial government
+- Created as a settlement for Catholic Chinese immigrants
+- That's over 430 years of continuous heritage!
+
+**Why It's Special:**
+- First Chinatown in the world (predates San Francisco's by over 250 years!)
+- Built for Chinese who converted to Christianity
+- Became a major trading hub connecting China and the Philippines
+- Survived Spanish colonization, American occupation, Japanese invasion, and modernization
+
+**Cultural Significance:**
+- Home to Saint Lorenzo Ruiz, the first Filipino saint (Chinese-Filipino heritage)
+- Preserved Chinese traditions while adapting to Filipino culture
+- Created unique Chinese-Filipino fusion in food, architecture, and customs
+
+**Today:**
+- Still a thriving community with original families' descendants
+- Maintains traditional businesses alongside modern establishments
+- Living testament to successful cultural integration
+- UNESCO recognition for its historical and cultural value
+
+From a small settlement for Chinese Catholics to the world's oldest Chinatown - Binondo's story is truly remarkable! 🏮"""
+    
+    return response
+
+def format_church_response():
+    """Format specific response about Binondo Church"""
+    response = """⛪ **Binondo Church - A Sacred Heritage Site!**
+
+**Minor Basilica of Saint Lorenzo Ruiz**
+
+🏛️ **Historical Significance:**
+- Founded in 1596 (just 2 years after Binondo was established!)
+- First church built in Binondo
+- Dedicated to Saint Lorenzo Ruiz, the first Filipino saint and martyr
+
+✨ **Architectural Beauty:**
+- Neo-classical style with unique Chinese architectural influences
+- Beautiful baroque altar featuring Chinese motifs
+- Religious art blending Filipino, Chinese, and Spanish styles
+- Historical artifacts from the Spanish colonial period
+
+🙏 **Cultural Importance:**
+- Center of Catholic worship for the Chinese-Filipino community
+- Houses the tomb and shrine of Saint Lorenzo Ruiz
+- Represents the successful blend of Chinese culture with Catholic faith
+- Site of important community celebrations and religious festivals
+
+**Why Visit:**
+The church is a perfect example of how Binondo successfully blended different cultures. You'll see Chinese design elements in a Catholic church, representing the unique identity of Chinese-Filipino Catholics who built this community over 400 years ago! 🏮"""
+    
+    return response
+
+def format_escolta_response():
+    """Format specific response about Escolta Street"""
+    escolta_data = KNOWLEDGE_STORE.get("escolta_street").fields
+    
+    response = f"""🛍️ **Escolta Street - {escolta_data['nickname']}**
+
+**Historic "Queen of Streets"**
+
+- **Period**: {escolta_data['period']}
+- **Description**: {escolta_data['description']}
+- **Highlights**:
+  - {', '.join(escolta_data['highlights'])}
+
+Escolta Street is a must-visit for its rich history and stunning architecture. Explore its Art Deco and Neoclassical buildings and experience the vibrant shopping culture that has defined Manila for over a century! 🏮"""
+    
+    return response
+
+def format_ongpin_response():
+    """Format specific response about Ongpin Street"""
+    ongpin_data = KNOWLEDGE_STORE.get("ongpin_street").fields
+    
+    response = f"""🏪 **Ongpin Street - {ongpin_data['significance']}**
+
+**Main Commercial Artery of Binondo**
+
+- **Description**: {ongpin_data['description']}
+- **Highlights**:
+  - {', '.join(ongpin_data['highlights'])}
+
+Ongpin Street is the heart of Binondo's commercial district, offering a unique blend of traditional Chinese businesses and modern conveniences. From gold shops to medicine stores, it's a bustling street that showcases the rich cultural heritage of Binondo! 🏮"""
+    
+    return response
+
+def format_comprehensive_response():
+    """Format comprehensive response about everything"""
+    response = """🏮 **Complete Guide to Binondo - World's Oldest Chinatown!**
+
+**🏛️ HERITAGE SITES:**
+⛪ Binondo Church (1596) - First Filipino saint's basilica
+🏛️ Plaza San Lorenzo Ruiz - Central heritage plaza  
+🛍️ Escolta Street - Historic "Queen of Streets"
+🏪 Ongpin Street - Main commercial artery
+
+**🍜 MUST-TRY FOOD:**
+🥟 Eng Bee Tin (1912) - Oldest Chinese bakery, famous hopia
+🥢 Dong Bei Dumplings - Authentic Chinese dumplings
+🍜 Ma Mon Luk - Historic wonton noodles
+🍽️ Traditional: Tikoy, dim sum, char siu, fresh noodles
+
+**🎭 CULTURAL TRADITIONS:**
+🧧 Chinese New Year - Dragon dances & fireworks
+🥮 Mooncake Festival - Mid-Autumn celebrations  
+💰 Gold trading - Traditional jewelry craftsmanship
+🌿 Chinese medicine - Herbal shops & acupuncture
+
+**📚 AMAZING HISTORY:**
+- Established 1594 - Over 430 years old!
+- World's oldest Chinatown
+- Created for Catholic Chinese immigrants
+- Survived colonization while preserving heritage
+
+**Why Binondo is Special:**
+It's not just a tourist destination - it's a living, breathing community where 400+ years of Chinese-Filipino culture continues to thrive. From traditional businesses run by the same families for generations to festivals that blend Catholic and Chinese traditions, Binondo is truly unique! 🏮"""
+    
+    return response
+
+def format_default_response():
+    """Default response for unclear queries"""
+    response = """🏮 **Welcome to Binondo Heritage Guide!**
+
+I'm here to help you discover the amazing world of Binondo - the world's oldest Chinatown! 
+
+**What would you like to know about?**
+
+🏛️ **Heritage Sites** - Churches, plazas, historic streets
+🍜 **Food & Restaurants** - Traditional cuisine and famous spots  
+🎭 **Cultural Traditions** - Festivals, customs, and practices
+📚 **History** - How Binondo became the world's oldest Chinatown
+⛪ **Specific Sites** - Binondo Church, Escolta Street, Ongpin Street
+
+**Try asking:**
+- "Tell me about food spots in Binondo"
+- "What are the heritage sites?"
+- "What's the history of Binondo?"
+- "What cultural festivals happen here?"
+- "What is the history of Eng Bee Tin?"
+
+I'm excited to share the rich 430+ year heritage of this amazing district with you! 🏮"""
+    
+    return response
+
+# entity kind -> formatter, see data/binondo_knowledge.json
+ENTITY_FORMATTERS = {
+    "food_spot": format_specific_food_response,
+    "heritage_site": format_specific_site_response,
+    "traditional_food": format_specific_traditional_food_response,
+}
+
+# topic -> response, see intent_router.TOPIC_KEYWORDS for the routing order
+TOPIC_RESPONSES = {
+    "food": format_food_response,
+    "heritage_sites": format_heritage_sites_response,
+    "cultural": format_cultural_response,
+    "history": format_history_response,
+    "church": format_church_response,
+    "escolta": format_escolta_response,
+    "ongpin": format_ongpin_response,
+    "comprehensive": format_comprehensive_response,
+}
+
+def warm_response_cache():
+    """Pre-render every topic and (entity, query type) response"""
+    for topic, format_response in TOPIC_RESPONSES.items():
+        RESPONSE_CACHE.warm((topic, None, None), format_response)
+    RESPONSE_CACHE.warm(("default", None, None), format_default_response)
+    
+    query_types = [name for name, _ in QUERY_TYPE_KEYWORDS] + [INTENT_INDEX.default_query_type]
+    for entity_key in set(ENTITY_MAPPING.values()):
+        for query_type in query_types:
+            RESPONSE_CACHE.warm(
+                ("entity", entity_key, query_type),
+                lambda: render_entity_info(entity_key, query_type)
+            )
+
+def sync_knowledge():
+    """Pre-render the knowledge base responses, once per process.
+
+    KNOWLEDGE_STORE reads the data file once at import, so an edited file
+    takes effect, with fresh in-memory caches, on the next restart.
+    """
+    global _knowledge_synced
+    if _knowledge_synced:
+        return
+    with _sync_lock:
+        if not _knowledge_synced:
+            warm_response_cache()
+            _knowledge_synced = True
@@ -1,15 +1,22 @@
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
 
 @dataclass
 class ModelConfig:
     """Configuration for the LLM model"""
     model_name: str = "microsoft/DialoGPT-medium"
-    max_length: int = 512
+    max_length: int = 512  # prompt plus generated tokens
     temperature: float = 0.7
     do_sample: bool = True
     device: str = "auto"
+    dtype: str = "float32"  # "float32", "bfloat16" or "int8" (dynamic quantization, CPU only)
+    enable_generation: bool = False
+    streaming: bool = True
+    max_new_tokens: int = 128
+    stream_timeout: float = 60.0
+    mmap_weights: bool = True  # load float32/bfloat16 CPU weights from a memory-mapped safetensors export
+    weights_dir: str = "./models"
 
 @dataclass
 class EmbeddingConfig:
@@ -17,13 +24,70 @@ class EmbeddingConfig:
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    batch_size: int = 32
+    cache_dir: Optional[str] = "./embedding_cache"  # document embeddings only
+    device: Optional[str] = None
+    query_cache_size: int = 256  # recent query embeddings, kept in memory
 
 @dataclass
 class VectorStoreConfig:
     """Configuration for vector store"""
     persist_directory: str = "./chroma_db"
     collection_name: str = "binondo_heritage"
+    legacy_collection_name: str = "langchain"
     search_k: int = 3
+    max_distance: float = 1.2
+    backend: str = "numpy"  # "chroma", "numpy" or "faiss"
+    faiss_index_type: str = "flat"  # "flat" or "hnsw"
+    index_path: str = "./vector_index"
+    keyword_index_path: str = "./keyword_index.sqlite3"
+    keyword_search_k: int = 3
+
+@dataclass
+class HybridConfig:
+    """Hybrid retrieval: concurrent retrievers fused with reciprocal-rank fusion"""
+    stages: Tuple[str, ...] = ("gazetteer", "lexical", "vector")
+    budget_ms: float = 250.0
+    rrf_k: int = 60
+    candidates_per_stage: int = 5
+    rerank_model: Optional[str] = None  # e.g. "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_top_n: int = 5
+    max_workers: int = 4
+
+@dataclass
+class ApiConfig:
+    """JSON API served next to the Streamlit UI, see api_server.py"""
+    enabled: bool = False  # also serve the API from the Streamlit process
+    host: str = "127.0.0.1"
+    port: int = 8765
+    max_concurrency: int = 8
+    queue_timeout: float = 5.0
+    keepalive_timeout: float = 15.0
+    body_timeout: float = 10.0  # to receive a request body once its headers arrived
+    max_body_bytes: int = 65536
+    max_header_bytes: int = 16384
+
+@dataclass
+class ServingConfig:
+    """Worker processes answering queries for the UI and API, see worker_pool.py"""
+    workers: int = 0  # 0 answers in the front-end process
+    start_method: str = "spawn"
+    threads_per_worker: int = 1  # torch/BLAS threads in each worker
+    request_timeout: float = 60.0
+
+@dataclass
+class AnalyticsConfig:
+    """Interaction log written off the request path, see interaction_log.py"""
+    enabled: bool = True
+    path: str = "./analytics/interactions.jsonl"
+    max_queue: int = 1024
+    batch_size: int = 64
+    flush_interval: float = 1.0
+    max_bytes: int = 5 * 1024 * 1024  # rotate to interactions.jsonl.1 past this size
+    backup_count: int = 3
+    overflow: str = "drop"  # "drop" or "block" (wait up to block_timeout for room, then drop)
+    block_timeout: float = 0.05
+    max_text_chars: int = 500
 
 @dataclass
 class AppConfig:
@@ -31,10 +95,32 @@ class AppConfig:
     page_title: str = "🏮 Binondo Heritage Guide"
     page_icon: str = "🏮"
     layout: str = "wide"
+    answer_cache_max_size: int = 256
+    answer_cache_ttl_seconds: float = 3600.0
+    semantic_cache_enabled: bool = True
+    semantic_cache_max_size: int = 256
+    semantic_cache_threshold: float = 0.92  # cosine similarity
+    enable_retrieval: bool = True
+    enable_keyword_search: bool = True
+    retrieval_mode: str = "cascade"  # "cascade" (keyword search, then vectors) or "hybrid"
+    batch_max_size: int = 8
+    batch_max_wait_ms: float = 10.0
+    history_window: int = 50
+    history_page_size: int = 20
+    history_spill_dir: Optional[str] = "./chat_history"
+    warmup_enabled: bool = True  # answer the suggested questions in the background at startup
+    warmup_workers: int = 4
+    tracing_enabled: bool = False
+    trace_dir: Optional[str] = "./traces"  # turns.jsonl and a Chrome trace (trace.json); None keeps them in memory
+    trace_turns: int = 20
 
-    model: ModelConfig = ModelConfig()
-    embedding: EmbeddingConfig = EmbeddingConfig()
-    vectorstore: VectorStoreConfig = VectorStoreConfig()
+    model: ModelConfig = field(default_factory=ModelConfig)
+    embedding: EmbeddingConfig = field(default_factory=EmbeddingConfig)
+    vectorstore: VectorStoreConfig = field(default_factory=VectorStoreConfig)
+    hybrid: HybridConfig = field(default_factory=HybridConfig)
+    api: ApiConfig = field(default_factory=ApiConfig)
+    analytics: AnalyticsConfig = field(default_factory=AnalyticsConfig)
+    serving: ServingConfig = field(default_factory=ServingConfig)
 
 ALTERNATIVE_MODELS = {
     "small": "microsoft/DialoGPT-small",  
@@ -42,6 +128,7 @@ ALTERNATIVE_MODELS = {
     "llama": "huggingface/CodeLlama-7b-Python-hf", 
     "mistral": "mistralai/Mistral-7B-Instruct-v0.1",  
     "phi": "microsoft/phi-2", 
+}
 
 def get_config() -> AppConfig:
     """Get application configuration"""
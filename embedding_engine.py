@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+import lazy_imports
+from config import EmbeddingConfig, get_config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+class EmbeddingDiskCache:
+    """Content-addressed embedding cache on disk.
+
+    Vectors are appended to a flat float32 file that is read back through a
+    memory map, and a JSON index maps each content key to its row. Several
+    processes (build_index, serving workers) may share one cache directory:
+    writers hold an exclusive lock on a lock file, re-read the index under it
+    and take each row number from the real end of the vector file, so a row
+    always points at the vector written for its key.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.lock_path = os.path.join(cache_dir, "write.lock")
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._rows, self._dim = self._read_index()
+        self._open_vectors()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _read_index(self):
+        """Rows and dimension on disk, keeping only rows whose vector was fully written"""
+        if not os.path.exists(self.index_path):
+            return {}, None
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        dim = index["dim"]
+        stored = os.path.getsize(self.vectors_path) // (dim * 4) if dim and os.path.exists(self.vectors_path) else 0
+        return {key: row for key, row in index["rows"].items() if row < stored}, dim
+
+    def _open_vectors(self):
+        if self._rows and self._dim:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                      shape=(max(self._rows.values()) + 1, self._dim))
+
+    @contextmanager
+    def _file_lock(self):
+        # exclusive across processes where fcntl exists; the thread lock covers the rest
+        with open(self.lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Look up cached vectors; missing keys are left out of the result"""
+        vectors, rows = self._vectors, self._rows
+        if vectors is None:
+            return {}
+        return {key: vectors[rows[key]] for key in keys if key in rows and rows[key] < len(vectors)}
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """Append new vectors and persist the index"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            # other processes may have appended since this one last looked
+            self._rows, dim = self._read_index()
+            self._dim = dim or self._dim or vectors.shape[1]
+            new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._rows]
+            if not new:
+                self._open_vectors()
+                return
+            row_size = self._dim * 4
+            with open(self.vectors_path, "ab") as f:
+                end = f.seek(0, os.SEEK_END)
+                # drop a partial row left by a crash mid-append
+                if end % row_size:
+                    f.truncate(end - end % row_size)
+                row = end // row_size
+                for key, vector in new:
+                    self._rows[key] = row
+                    f.write(vector.tobytes())
+                    row += 1
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": self._dim, "rows": self._rows}, f)
+            os.replace(tmp_path, self.index_path)
+            self._open_vectors()
+
+class EmbeddingEngine:
+    """Batched embedding through HuggingFaceEmbeddings with an optional disk cache.
+
+    Exposes embed_documents/embed_query so it can stand in for the LangChain
+    embeddings object anywhere, including as a Chroma embedding function.
+    Only document embeddings go to the disk cache; user queries are unbounded
+    in number, so the most recent ones are kept in a small in-memory LRU.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 32, cache_dir: Optional[str] = None,
+                 device: Optional[str] = None, query_cache_size: int = 256):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = device
+        self.cache = EmbeddingDiskCache(os.path.join(cache_dir, cache_slug(model_name))) if cache_dir else None
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.query_cache_size = query_cache_size
+        self._queries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._queries_lock = threading.Lock()
+        self.computed = 0
+        self.cache_hits = 0
+
+    @property
+    def model(self):
+        """The underlying HuggingFaceEmbeddings, loaded on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    model_kwargs = {"device": self.device} if self.device else {}
+                    self._model = lazy_imports.get_embeddings_class()(
+                        model_name=self.model_name,
+                        model_kwargs=model_kwargs,
+                        encode_kwargs={"batch_size": self.batch_size}
+                    )
+        return self._model
+
+    def _content_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _compute(self, texts: List[str]) -> np.ndarray:
+        torch = lazy_imports.get_torch()
+        batches = []
+        with torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                batch = texts[start:start + self.batch_size]
+                batches.append(np.asarray(self.model.embed_documents(batch), dtype=np.float32))
+        self.computed += len(texts)
+        return np.concatenate(batches)
+
+    def embed(self, texts: List[str], persist: bool = True) -> np.ndarray:
+        """Embed texts as an (n, dim) float32 array, computing only uncached ones"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        keys = [self._content_key(text) for text in texts]
+        cached = self.cache.get_many(keys) if self.cache is not None else {}
+        self.cache_hits += sum(1 for key in keys if key in cached)
+
+        # each distinct uncached text is embedded once, in batches
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in pending:
+                pending[key] = text
+        if pending:
+            computed = self._compute(list(pending.values()))
+            if self.cache is not None and persist:
+                self.cache.put_many(list(pending), computed)
+            cached.update(zip(pending, computed))
+        return np.stack([cached[key] for key in keys])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """LangChain-compatible document embedding"""
+        return self.embed(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """LangChain-compatible query embedding"""
+        with self._queries_lock:
+            vector = self._queries.get(text)
+            if vector is not None:
+                self._queries.move_to_end(text)
+                self.cache_hits += 1
+        if vector is None:
+            vector = self.embed([text], persist=False)[0]
+            with self._queries_lock:
+                self._queries[text] = vector
+                while len(self._queries) > self.query_cache_size:
+                    self._queries.popitem(last=False)
+        return vector.tolist()
+
+def cache_slug(model_name: str) -> str:
+    """Directory name for a model's cache"""
+    return model_name.replace("/", "__")
+
+def create_embedding_engine(config: Optional[EmbeddingConfig] = None) -> EmbeddingEngine:
+    """Build an engine from EmbeddingConfig"""
+    config = config or get_config().embedding
+    return EmbeddingEngine(config.model_name, batch_size=config.batch_size,
+                           cache_dir=config.cache_dir, device=config.device,
+                           query_cache_size=config.query_cache_size)
@@ -0,0 +1,84 @@
+from collections import deque
+from typing import Dict, List, Tuple
+
+class EntityMatcher:
+    """Aho-Corasick automaton over entity names.
+
+    The automaton is compiled once from a name -> entity key mapping and then
+    matches every name in a single pass over the query. Matches must sit on
+    word boundaries, and when matches overlap the longest one wins.
+    """
+
+    def __init__(self, entity_mapping: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[str]] = [[]]
+        self._entity_mapping = {name.lower(): key for name, key in entity_mapping.items()}
+
+        for name in self._entity_mapping:
+            self._add_pattern(name)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._entity_mapping)
+
+    def _add_pattern(self, pattern: str):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._outputs[node].append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # inherit the patterns that end at the failure target, longest first
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def find_all(self, query: str) -> List[Tuple[int, int, str]]:
+        """Find every (start, end, name) occurrence that sits on word boundaries"""
+        text = query.lower()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not outputs[node]:
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            for pattern in outputs[node]:
+                start = end - len(pattern)
+                if start == 0 or not text[start - 1].isalnum():
+                    matches.append((start, end, pattern))
+        return matches
+
+    def match(self, query: str) -> List[Tuple[str, str]]:
+        """Return non-overlapping (entity_name, entity_key) matches, longest match first"""
+        found_entities = []
+        seen = set()
+        last_end = 0
+        for start, end, name in sorted(self.find_all(query), key=lambda m: (m[0], m[0] - m[1])):
+            if start < last_end:
+                continue
+            last_end = end
+            if name not in seen:
+                seen.add(name)
+                found_entities.append((name, self._entity_mapping[name]))
+        return found_entities
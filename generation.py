@@ -0,0 +1,163 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+import lazy_imports
+from batch_scheduler import MicroBatchScheduler
+from config import get_config
+from model_registry import MODEL_REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# timing of the most recent generations, newest last
+GENERATION_STATS: deque = deque(maxlen=50)
+
+_scheduler: Optional[MicroBatchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+def get_generator():
+    """Tokenizer and causal LM for ModelConfig from the shared model registry"""
+    loaded = MODEL_REGISTRY.get(get_config().model)
+    return loaded.tokenizer, loaded.model
+
+def _prepare_prompt(tokenizer, prompt: str) -> str:
+    # DialoGPT expects each conversational turn to end with EOS
+    if "dialogpt" in get_config().model.model_name.lower():
+        return prompt + tokenizer.eos_token
+    return prompt
+
+def tokenize_prompts(tokenizer, prompts: List[str], **kwargs):
+    """Tokenize prompts to fit max_length with the new tokens, cutting the oldest context first"""
+    config = get_config().model
+    # truncating from the left keeps the question and the Answer: cue at the end of the prompt
+    tokenizer.truncation_side = "left"
+    return tokenizer([_prepare_prompt(tokenizer, prompt) for prompt in prompts], return_tensors="pt",
+                     truncation=True, max_length=config.max_length - config.max_new_tokens, **kwargs)
+
+def build_prompt(query: str, context_chunks: Optional[List[str]] = None) -> str:
+    """Prompt the model with retrieved heritage notes followed by the question"""
+    if not context_chunks:
+        return query
+    context = "\n\n".join(context_chunks)
+    return f"Binondo heritage notes:\n{context}\n\nQuestion: {query}\nAnswer:"
+
+def _stop_when_set(event: threading.Event):
+    """Stopping criteria that end generation at the next token once event is set"""
+    transformers = lazy_imports.lazy_import("transformers")
+    torch = lazy_imports.get_torch()
+
+    class StopWhenSet(transformers.StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            return torch.full((input_ids.shape[0],), event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+    return transformers.StoppingCriteriaList([StopWhenSet()])
+
+def stream_generate(prompt: str) -> Iterator[str]:
+    """Yield generated text as the model produces it, recording TTFT and tokens/sec"""
+    config = get_config().model
+    tokenizer, model = get_generator()
+    transformers = lazy_imports.lazy_import("transformers")
+
+    inputs = tokenize_prompts(tokenizer, [prompt]).to(model.device)
+    streamer = transformers.TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True,
+                                                 timeout=config.stream_timeout)
+    result: Dict = {}
+    stop = threading.Event()
+
+    def run():
+        try:
+            result["output"] = model.generate(
+                **inputs,
+                streamer=streamer,
+                stopping_criteria=_stop_when_set(stop),
+                max_new_tokens=config.max_new_tokens,
+                do_sample=config.do_sample,
+                temperature=config.temperature,
+                pad_token_id=tokenizer.eos_token_id
+            )
+        except Exception as e:
+            # unblock the consumer now instead of after stream_timeout; it re-raises
+            result["error"] = e
+            streamer.end()
+
+    start = time.perf_counter()
+    first_token_at = None
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        for text in streamer:
+            if text and first_token_at is None:
+                first_token_at = time.perf_counter()
+            yield text
+    finally:
+        # a consumer that stops early, such as a disconnected API client, ends generation too
+        stop.set()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    record_generation(start, first_token_at, result, inputs["input_ids"].shape[1])
+
+def record_generation(start: float, first_token_at: Optional[float], result: Dict, prompt_tokens: int):
+    """Log and keep the TTFT and decode speed of one request"""
+    elapsed = time.perf_counter() - start
+    new_tokens = result["output"].shape[1] - prompt_tokens if "output" in result else 0
+    ttft = (first_token_at - start) if first_token_at else elapsed
+    decode_time = elapsed - ttft
+    stats = {
+        "ttft_ms": ttft * 1000,
+        "tokens": int(new_tokens),
+        "tokens_per_s": new_tokens / decode_time if decode_time > 0 else 0.0,
+        "total_ms": elapsed * 1000
+    }
+    GENERATION_STATS.append(stats)
+    logger.info(f"Generation: TTFT {stats['ttft_ms']:.0f}ms, {stats['tokens']} tokens, "
+                f"{stats['tokens_per_s']:.1f} tokens/s, total {stats['total_ms']:.0f}ms")
+
+def generate_batch(prompts: List[str]) -> List[str]:
+    """Generate replies for several prompts in one left-padded forward pass"""
+    config = get_config().model
+    tokenizer, model = get_generator()
+    torch = lazy_imports.get_torch()
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+
+    inputs = tokenize_prompts(tokenizer, prompts, padding=True).to(model.device)
+    start = time.perf_counter()
+    with torch.inference_mode():
+        output = model.generate(
+            **inputs,
+            max_new_tokens=config.max_new_tokens,
+            do_sample=config.do_sample,
+            temperature=config.temperature,
+            pad_token_id=tokenizer.pad_token_id
+        )
+    elapsed = time.perf_counter() - start
+    new_tokens = output[:, inputs["input_ids"].shape[1]:]
+    logger.info(f"Generation: batch of {len(prompts)}, {new_tokens.numel()} tokens in {elapsed * 1000:.0f}ms")
+    return [text.strip() for text in tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
+
+def get_generation_scheduler() -> MicroBatchScheduler:
+    """Micro-batching scheduler shared by every session, started on first use"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                config = get_config()
+                _scheduler = MicroBatchScheduler(generate_batch, max_batch_size=config.batch_max_size,
+                                                 max_wait_ms=config.batch_max_wait_ms, name="generation-batcher")
+    return _scheduler
+
+def generation_scheduler_stats() -> Optional[Dict]:
+    """Scheduler stats, or None if nothing has been generated through it yet"""
+    return _scheduler.stats() if _scheduler is not None else None
+
+def generate_answer(prompt: str) -> Optional[str]:
+    """Generate one reply through the shared batching scheduler, or None if generation fails"""
+    try:
+        return get_generation_scheduler().run(prompt, timeout=get_config().model.stream_timeout) or None
+    except Exception as e:
+        logger.warning(f"Generation failed: {e}")
+        return None
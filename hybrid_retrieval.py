@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+class Candidate(NamedTuple):
+    id: str
+    text: str
+    score: float = 0.0
+
+class StageTiming(NamedTuple):
+    stage: str
+    status: str  # "ok", "empty", "timeout", "busy" or "error"
+    elapsed_ms: float
+    hits: int
+
+class HybridResult(NamedTuple):
+    candidates: List[Candidate]
+    timings: List[StageTiming]
+    total_ms: float
+
+# a retriever maps (query, k) to candidates, best first
+Retriever = Callable[[str, int], List[Candidate]]
+# a reranker scores (query, candidates), higher is better
+Reranker = Callable[[str, Sequence[Candidate]], Sequence[float]]
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[str]], k: int = 60,
+                           weights: Optional[Dict[str, float]] = None) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: each id scores sum(weight / (k + rank)) over the lists it appears in"""
+    scores: Dict[str, float] = {}
+    for name, ids in rankings.items():
+        weight = (weights or {}).get(name, 1.0)
+        for rank, doc_id in enumerate(ids, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+class HybridRetriever:
+    """Runs several retrievers concurrently and fuses their rankings.
+
+    Every stage gets the same latency budget, measured from the start of the
+    request; a stage that has not finished by then is left out of the fusion
+    instead of holding up the reply, and until that overrun run finishes the
+    stage is not started again, so a stuck stage cannot fill the pool.
+    Requests that overlap within their budgets each run every stage.
+    The optional reranker only sees the fused top rerank_top_n and is skipped
+    too if the budget is already spent.
+    """
+
+    def __init__(self, retrievers: Dict[str, Retriever], budget_ms: float = 250.0, rrf_k: int = 60,
+                 weights: Optional[Dict[str, float]] = None, reranker: Optional[Reranker] = None,
+                 rerank_top_n: int = 5, executor: Optional[Executor] = None):
+        self.retrievers = retrievers
+        self.budget_ms = budget_ms
+        self.rrf_k = rrf_k
+        self.weights = weights
+        self.reranker = reranker
+        self.rerank_top_n = rerank_top_n
+        self.executor = executor or ThreadPoolExecutor(max_workers=len(retrievers) + 1,
+                                                       thread_name_prefix="hybrid-retrieval")
+        # runs that missed their deadline and may still be going, by stage
+        self._overrun: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _timed(self, run: Callable, *args):
+        start = time.perf_counter()
+        result = run(*args)
+        return result, (time.perf_counter() - start) * 1000
+
+    def retrieve(self, query: str, k: int = 3, per_stage_k: Optional[int] = None) -> HybridResult:
+        """Top-k fused candidates for a query with per-stage timings"""
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000
+        per_stage_k = per_stage_k or max(k, self.rerank_top_n)
+
+        timings: List[StageTiming] = []
+        futures: Dict[str, Future] = {}
+        with self._lock:
+            for name, retriever in self.retrievers.items():
+                previous = self._overrun.get(name)
+                if previous is not None and not previous.done():
+                    timings.append(StageTiming(name, "busy", 0.0, 0))
+                    continue
+                futures[name] = self.executor.submit(
+                    self._timed, retriever, query, per_stage_k
+                )
+        wait(futures.values(), timeout=max(0.0, deadline - time.perf_counter()))
+
+        rankings: Dict[str, List[str]] = {}
+        texts: Dict[str, str] = {}
+        for name, future in futures.items():
+            if not future.done():
+                # keeps running in the background (e.g. a first model load) but is not waited for
+                if not future.cancel():
+                    with self._lock:
+                        self._overrun[name] = future
+                timings.append(StageTiming(name, "timeout", (time.perf_counter() - start) * 1000, 0))
+                continue
+            try:
+                candidates, elapsed_ms = future.result()
+            except Exception as e:
+                logger.warning(f"Hybrid retrieval stage {name} failed: {e}")
+                timings.append(StageTiming(name, "error", (time.perf_counter() - start) * 1000, 0))
+                continue
+            timings.append(StageTiming(name, "ok" if candidates else "empty", elapsed_ms, len(candidates)))
+            rankings[name] = [candidate.id for candidate in candidates]
+            for candidate in candidates:
+                texts.setdefault(candidate.id, candidate.text)
+
+        fused = [Candidate(doc_id, texts[doc_id], score)
+                 for doc_id, score in reciprocal_rank_fusion(rankings, self.rrf_k, self.weights)]
+        if self.reranker is not None and len(fused) > 1:
+            fused = self._rerank(query, fused, deadline, timings)
+
+        total_ms = (time.perf_counter() - start) * 1000
+        logger.info("Hybrid retrieval: " + ", ".join(
+            f"{t.stage} {t.status} {t.elapsed_ms:.1f}ms" for t in timings) + f", total {total_ms:.1f}ms")
+        return HybridResult(fused[:k], timings, total_ms)
+
+    def _rerank(self, query: str, fused: List[Candidate], deadline: float,
+                timings: List[StageTiming]) -> List[Candidate]:
+        remaining = deadline - time.perf_counter()
+        head, tail = fused[:self.rerank_top_n], fused[self.rerank_top_n:]
+        if remaining <= 0:
+            timings.append(StageTiming("rerank", "timeout", 0.0, 0))
+            return fused
+        future = self.executor.submit(self._timed, self.reranker, query, head)
+        try:
+            scores, elapsed_ms = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            timings.append(StageTiming("rerank", "timeout", remaining * 1000, 0))
+            return fused
+        except Exception as e:
+            logger.warning(f"Reranking failed: {e}")
+            timings.append(StageTiming("rerank", "error", 0.0, 0))
+            return fused
+        timings.append(StageTiming("rerank", "ok", elapsed_ms, len(head)))
+        order = sorted(range(len(head)), key=lambda i: scores[i], reverse=True)
+        return [head[i]._replace(score=float(scores[i])) for i in order] + tail
@@ -0,0 +1,237 @@
+"""Memory-mapped snapshot format for the vector index and its chunks.
+
+One file, opened with mmap; nothing is parsed up front beyond a small JSON
+header, so opening takes the same time for ten chunks or a million, and every
+process that opens the file shares its pages through the OS cache.
+
+    magic        8 bytes  b"BNDSNAP1"
+    header size  uint64   little-endian
+    header       JSON: count, dim and the (offset, size) of each section
+    sections, each 64-byte aligned:
+      vectors           float32 (count, dim), rows L2-normalized
+      *_offsets         uint64 (count + 1) byte offsets into the matching blob
+      ids, texts        UTF-8 blobs
+      metadata          UTF-8 blob of one compact JSON object per chunk
+
+Export the persisted Chroma collection (read straight from chroma.sqlite3,
+without chromadb) into the configured index directory:
+
+    python index_snapshot.py [--collection langchain] [--output vector_index/index.snapshot]
+"""
+import argparse
+import json
+import mmap
+import os
+import sqlite3
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import get_config
+
+MAGIC = b"BNDSNAP1"
+VERSION = 1
+ALIGNMENT = 64
+SNAPSHOT_FILENAME = "index.snapshot"
+
+# chromadb's embeddings_queue operation codes
+CHROMA_ADD, CHROMA_UPDATE, CHROMA_UPSERT, CHROMA_DELETE = 0, 1, 2, 3
+CHROMA_DOCUMENT_KEY = "chroma:document"
+
+class ChromaQueuePurged(ValueError):
+    """The collection exists but Chroma has flushed its vectors out of the embeddings queue"""
+
+def _blob(values: List[bytes]) -> Tuple[np.ndarray, bytes]:
+    offsets = np.zeros(len(values) + 1, dtype="<u8")
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+    return offsets, b"".join(values)
+
+def write_snapshot(path: str, vectors: np.ndarray, texts: List[str], metadatas: List[Optional[Dict]],
+                   ids: List[str]):
+    """Write a snapshot of normalized vectors and their chunks; replaced atomically"""
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    count = len(texts)
+    if vectors.shape[0] != count or len(ids) != count or len(metadatas) != count:
+        raise ValueError("vectors, texts, metadatas and ids must have the same length")
+
+    id_offsets, id_blob = _blob([doc_id.encode("utf-8") for doc_id in ids])
+    text_offsets, text_blob = _blob([text.encode("utf-8") for text in texts])
+    metadata_offsets, metadata_blob = _blob([
+        json.dumps(metadata, ensure_ascii=False, separators=(",", ":")).encode("utf-8") if metadata else b""
+        for metadata in metadatas
+    ])
+    sections = [
+        ("vectors", vectors.tobytes()),
+        ("id_offsets", id_offsets.tobytes()),
+        ("ids", id_blob),
+        ("text_offsets", text_offsets.tobytes()),
+        ("texts", text_blob),
+        ("metadata_offsets", metadata_offsets.tobytes()),
+        ("metadata", metadata_blob),
+    ]
+
+    # section offsets depend on the header size, which depends on the offsets; a fixed-width
+    # placeholder pass settles it
+    layout = {name: [0, len(data)] for name, data in sections}
+    header = {"version": VERSION, "count": count, "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+              "sections": layout}
+    header_size = len(json.dumps(header).encode("utf-8")) + 32 * len(sections)
+    position = _align(len(MAGIC) + 8 + header_size)
+    for name, data in sections:
+        layout[name][0] = position
+        position = _align(position + len(data))
+    header_bytes = json.dumps(header).encode("utf-8").ljust(header_size)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial_path = f"{path}.{os.getpid()}.partial"
+    with open(partial_path, "wb") as f:
+        f.write(MAGIC + np.uint64(header_size).astype("<u8").tobytes() + header_bytes)
+        for name, data in sections:
+            f.write(b"\0" * (layout[name][0] - f.tell()))
+            f.write(data)
+    os.replace(partial_path, path)
+
+def _align(position: int) -> int:
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+class BlobColumn(Sequence):
+    """Read-only sequence of strings decoded on access from a blob and its offsets"""
+
+    def __init__(self, buffer, offsets: np.ndarray, base: int):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._base = base
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _decode(self, data: bytes) -> Any:
+        return data.decode("utf-8")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        start = self._base + int(self._offsets[index])
+        end = self._base + int(self._offsets[index + 1])
+        return self._decode(self._buffer[start:end])
+
+class MetadataColumn(BlobColumn):
+    def _decode(self, data: bytes) -> Dict:
+        return json.loads(data) if data else {}
+
+class IndexSnapshot:
+    """A snapshot file opened through mmap, with zero-copy NumPy views of its sections"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an index snapshot")
+        header_size = int(np.frombuffer(self._mmap, dtype="<u8", count=1, offset=len(MAGIC))[0])
+        start = len(MAGIC) + 8
+        header = json.loads(self._mmap[start:start + header_size])
+        if header["version"] != VERSION:
+            raise ValueError(f"Unsupported snapshot version {header['version']} in {path}")
+        self.count = header["count"]
+        self.dim = header["dim"]
+        sections = header["sections"]
+
+        offset, _ = sections["vectors"]
+        self.vectors = np.frombuffer(self._mmap, dtype="<f4", count=self.count * self.dim,
+                                     offset=offset).reshape(self.count, self.dim)
+        self.ids = BlobColumn(self._mmap, self._offsets(sections["id_offsets"]), sections["ids"][0])
+        self.texts = BlobColumn(self._mmap, self._offsets(sections["text_offsets"]), sections["texts"][0])
+        self.metadatas = MetadataColumn(self._mmap, self._offsets(sections["metadata_offsets"]),
+                                        sections["metadata"][0])
+
+    def _offsets(self, section) -> np.ndarray:
+        return np.frombuffer(self._mmap, dtype="<u8", count=self.count + 1, offset=section[0])
+
+    def __len__(self) -> int:
+        return self.count
+
+def read_chroma_collection(persist_directory: str, collection_name: str) -> Tuple[List[str], np.ndarray, List[str], List[Dict]]:
+    """(ids, vectors, documents, metadatas) of a persisted Chroma collection, read from chroma.sqlite3.
+
+    Replays the collection's embeddings queue, which holds every vector until
+    Chroma purges it after flushing its HNSW segment; a purged collection
+    raises ChromaQueuePurged and has to be read through chromadb instead.
+    """
+    path = os.path.join(persist_directory, "chroma.sqlite3")
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT id, dimension FROM collections WHERE name = ?", (collection_name,)).fetchone()
+        if row is None:
+            raise ValueError(f"No collection {collection_name!r} in {path}")
+        collection_id, dimension = row
+        stored = conn.execute("SELECT count(*) FROM embeddings e JOIN segments s ON e.segment_id = s.id "
+                              "WHERE s.collection = ?", (collection_id,)).fetchone()[0]
+
+        records: Dict[str, Tuple[Optional[bytes], Dict]] = {}
+        rows = conn.execute("SELECT id, operation, vector, encoding, metadata FROM embeddings_queue "
+                            "WHERE topic LIKE ? ORDER BY seq_id", (f"%/{collection_id}",))
+        for doc_id, operation, vector, encoding, metadata in rows:
+            if encoding not in (None, "FLOAT32"):
+                raise ValueError(f"Unsupported vector encoding {encoding} in {path}")
+            metadata = json.loads(metadata) if metadata else {}
+            if operation == CHROMA_DELETE:
+                records.pop(doc_id, None)
+            elif doc_id in records and operation in (CHROMA_UPDATE, CHROMA_UPSERT):
+                old_vector, merged = records[doc_id]
+                merged = dict(merged)
+                for key, value in metadata.items():
+                    if value is None:
+                        merged.pop(key, None)
+                    else:
+                        merged[key] = value
+                records[doc_id] = (vector or old_vector, merged)
+            elif operation in (CHROMA_ADD, CHROMA_UPSERT) and doc_id not in records:
+                records[doc_id] = (vector, metadata)
+    finally:
+        conn.close()
+
+    if len(records) < stored or any(vector is None for vector, _ in records.values()):
+        raise ChromaQueuePurged(f"Chroma has purged vectors of {collection_name!r} from its queue")
+
+    ids = list(records)
+    vectors = np.frombuffer(b"".join(records[doc_id][0] for doc_id in ids), dtype="<f4").reshape(len(ids), dimension or -1)
+    documents, metadatas = [], []
+    for doc_id in ids:
+        metadata = dict(records[doc_id][1])
+        documents.append(metadata.pop(CHROMA_DOCUMENT_KEY, "") or "")
+        metadatas.append(metadata)
+    return ids, vectors, documents, metadatas
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a persisted Chroma collection to an index snapshot")
+    config = get_config().vectorstore
+    parser.add_argument("--persist-directory", default=config.persist_directory)
+    parser.add_argument("--collection", help="defaults to the configured collection, then the legacy one")
+    parser.add_argument("--output", default=os.path.join(config.index_path, SNAPSHOT_FILENAME))
+    args = parser.parse_args()
+
+    from vector_index import normalize_rows
+    collections = [args.collection] if args.collection else [config.collection_name, config.legacy_collection_name]
+    for collection_name in collections:
+        try:
+            ids, vectors, documents, metadatas = read_chroma_collection(args.persist_directory, collection_name)
+        except ValueError as e:
+            print(f"{collection_name}: {e}")
+            continue
+        if ids:
+            write_snapshot(args.output, normalize_rows(vectors), documents, metadatas, ids)
+            print(f"Wrote {len(ids)} chunks from {collection_name!r} to {args.output}")
+            return
+    raise SystemExit("No collection with vectors to export")
+
+if __name__ == "__main__":
+    main()
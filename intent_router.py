@@ -0,0 +1,100 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# keyword tables, highest priority first
+QUERY_TYPE_KEYWORDS = [
+    ("history", ["history", "founded", "established", "started", "began", "origin"]),
+    ("architecture", ["architecture", "building", "design", "structure"]),
+    ("significance", ["significance", "important", "why", "special"]),
+    ("food", ["food", "eat", "taste", "specialty", "famous for"]),
+    ("location", ["location", "where", "address", "find"]),
+]
+
+TOPIC_KEYWORDS = [
+    ("food", ["food", "eat", "restaurant", "spots", "dining", "cuisine"]),
+    ("heritage_sites", ["heritage", "sites", "church", "plaza", "street", "buildings"]),
+    ("cultural", ["cultural", "traditions", "festivals", "culture", "events", "celebrations"]),
+    ("history", ["history", "oldest", "established", "founded", "chinatown"]),
+    ("church", ["binondo church", "saint lorenzo", "lorenzo ruiz"]),
+    ("escolta", ["escolta", "queen of streets"]),
+    ("ongpin", ["ongpin", "commercial"]),
+    ("comprehensive", ["all", "everything", "comprehensive", "overview", "about binondo"]),
+]
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+class Intent(NamedTuple):
+    query_type: str
+    topic: Optional[str]
+
+def tokenize(query: str) -> List[str]:
+    """Lower-case the query and split it into word tokens"""
+    return TOKEN_PATTERN.findall(query.lower())
+
+class IntentIndex:
+    """Inverted index from keyword tokens to intents.
+
+    Single-word keywords match any token they are a prefix of, so "food" still
+    matches "foods". Phrases match consecutive tokens exactly. A query is
+    tokenized once and every intent is scored in the same pass.
+    """
+
+    def __init__(self, query_type_table: Sequence[Tuple[str, List[str]]],
+                 topic_table: Sequence[Tuple[str, List[str]]], default_query_type: str = "general"):
+        self.default_query_type = default_query_type
+        self.query_types = [name for name, _ in query_type_table]
+        self.topics = [name for name, _ in topic_table]
+        self._words: Dict[str, List[int]] = {}
+        self._phrases: Dict[Tuple[str, ...], List[int]] = {}
+
+        # query types take slots [0, n) and topics [n, n + m), in priority order
+        tables = list(query_type_table) + list(topic_table)
+        for slot, (_, keywords) in enumerate(tables):
+            for keyword in keywords:
+                tokens = tuple(tokenize(keyword))
+                if len(tokens) == 1:
+                    self._words.setdefault(tokens[0], []).append(slot)
+                else:
+                    self._phrases.setdefault(tokens, []).append(slot)
+
+        self._slot_count = len(tables)
+        self._min_word = min((len(w) for w in self._words), default=1)
+        self._max_word = max((len(w) for w in self._words), default=0)
+        self._phrase_starts = {p[0] for p in self._phrases}
+        self._phrase_lengths = sorted({len(p) for p in self._phrases})
+        # token -> slots it hits through keyword prefixes; the query vocabulary is small
+        self._token_slots: Dict[str, Tuple[int, ...]] = {}
+
+    def _slots_for_token(self, token: str) -> Tuple[int, ...]:
+        slots = self._token_slots.get(token)
+        if slots is None:
+            slots = tuple(slot
+                          for end in range(self._min_word, min(len(token), self._max_word) + 1)
+                          for slot in self._words.get(token[:end], ()))
+            if len(self._token_slots) >= 50000:
+                self._token_slots.clear()
+            self._token_slots[token] = slots
+        return slots
+
+    def score(self, tokens: List[str]) -> List[int]:
+        """Count keyword hits for every query type and topic slot"""
+        scores = [0] * self._slot_count
+        for i, token in enumerate(tokens):
+            for slot in self._slots_for_token(token):
+                scores[slot] += 1
+            if token in self._phrase_starts:
+                for length in self._phrase_lengths:
+                    for slot in self._phrases.get(tuple(tokens[i:i + length]), ()):
+                        scores[slot] += 1
+        return scores
+
+    def classify(self, query: str) -> Intent:
+        """Return the highest priority query type and topic that the query hits"""
+        scores = self.score(tokenize(query))
+        split = len(self.query_types)
+        query_type = next((name for name, hits in zip(self.query_types, scores[:split]) if hits),
+                          self.default_query_type)
+        topic = next((name for name, hits in zip(self.topics, scores[split:]) if hits), None)
+        return Intent(query_type, topic)
+
+INTENT_INDEX = IntentIndex(QUERY_TYPE_KEYWORDS, TOPIC_KEYWORDS)
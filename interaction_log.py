@@ -0,0 +1,167 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import AnalyticsConfig, get_config
+
+logger = logging.getLogger(__name__)
+
+class InteractionLog:
+    """Append-only JSONL sink for chat analytics, written by a background thread.
+
+    record() only puts the event on a bounded queue, so a chat turn never waits
+    on disk I/O. The writer drains up to batch_size events at a time (or what
+    arrived within flush_interval) into a single write, and rotates the file to
+    .1 ... .backup_count once it passes max_bytes. When the queue is full an
+    event is dropped, after waiting up to block_timeout for room with the
+    "block" overflow policy.
+    """
+
+    def __init__(self, path: str, max_queue: int = 1024, batch_size: int = 64, flush_interval: float = 1.0,
+                 max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3, overflow: str = "drop",
+                 block_timeout: float = 0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def record(self, event: Dict[str, Any]) -> bool:
+        """Queue an event for writing; returns False if it was dropped"""
+        if self._worker is None:
+            self._start()
+        try:
+            if self.overflow == "block":
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _start(self):
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="interaction-log", daemon=True)
+                self._worker.start()
+                atexit.register(self.close)
+
+    def _collect(self) -> Optional[List[Dict[str, Any]]]:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if event is None:
+                self._queue.put(None)
+                break
+            batch.append(event)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                self._write(batch)
+            except OSError as e:
+                logger.warning(f"Could not write {len(batch)} interaction events: {e}")
+                self.dropped += len(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        data = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in batch).encode("utf-8")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self.written += len(batch)
+        self.batches += 1
+
+    def _rotate(self):
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Write the events queued so far and stop the writer"""
+        worker = self._worker
+        if worker is None or not worker.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        worker.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Written/dropped counters and current queue depth"""
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "queue_depth": self._queue.qsize(),
+        }
+
+def create_interaction_log(config: Optional[AnalyticsConfig] = None) -> InteractionLog:
+    config = config or get_config().analytics
+    return InteractionLog(
+        config.path,
+        max_queue=config.max_queue,
+        batch_size=config.batch_size,
+        flush_interval=config.flush_interval,
+        max_bytes=config.max_bytes,
+        backup_count=config.backup_count,
+        overflow=config.overflow,
+        block_timeout=config.block_timeout,
+    )
+
+# shared by every session in the process; the writer thread starts with the first event
+INTERACTION_LOG = create_interaction_log()
+
+def log_interaction(query: str, response: str, latency_ms: Optional[float] = None, cache_hit: Optional[bool] = None,
+                    source: str = "ui", session_id: Optional[str] = None) -> bool:
+    """Queue one chat turn for the analytics log; never blocks on disk"""
+    config = get_config().analytics
+    if not config.enabled:
+        return False
+    return INTERACTION_LOG.record({
+        "timestamp": time.time(),
+        "source": source,
+        "session": session_id,
+        "query": query[:config.max_text_chars],
+        "response": response[:config.max_text_chars],
+        "response_length": len(response),
+        "latency_ms": latency_ms,
+        "cache_hit": cache_hit,
+    })
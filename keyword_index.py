@@ -0,0 +1,118 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from intent_router import tokenize
+from knowledge import KNOWLEDGE_STORE, KnowledgeStore, iter_knowledge_documents
+
+logger = logging.getLogger(__name__)
+
+# bm25() weights for the name, aliases and body columns
+COLUMN_WEIGHTS = (10.0, 5.0, 1.0)
+
+# words that would otherwise match most of the corpus
+STOPWORDS = frozenset("""
+a about an and any are as at be binondo by can do does for from give how i in is it me more of on or
+some tell that the there this to was what when where which who why with you your
+""".split())
+
+SCHEMA = (
+    """CREATE VIRTUAL TABLE entity_fts USING fts5(
+        doc_id UNINDEXED, name, aliases, body,
+        tokenize = 'porter unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )""",
+    "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+class KeywordHit(NamedTuple):
+    id: str
+    text: str
+    score: float
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 MATCH expression ORing a prefix term per content word, or None if there are none"""
+    terms = [token for token in dict.fromkeys(tokenize(query)) if token not in STOPWORDS and len(token) > 1]
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"*' for term in terms)
+
+MMAP_SIZE = 64 * 1024 * 1024
+
+class KeywordIndex:
+    """BM25-ranked SQLite FTS5 index over every field of every knowledge entity.
+
+    The index lives in one local SQLite file that records the knowledge
+    fingerprint it was built from; it is rebuilt only when that changes.
+    One connection is shared by every session behind a lock.
+    """
+
+    def __init__(self, path: str, store: Optional[KnowledgeStore] = None):
+        self.path = path
+        self.store = store or KNOWLEDGE_STORE
+        self._lock = threading.Lock()
+        self._conn = self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        # reads go through a shared memory map, so worker processes share pages instead of private caches
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        except sqlite3.DatabaseError:
+            row = None
+        if row is None or row[0] != self.store.fingerprint:
+            self._build(conn)
+        return conn
+
+    def _build(self, conn: sqlite3.Connection):
+        start = time.perf_counter()
+        # one explicit transaction: sqlite3 opens none before DDL and executescript would commit,
+        # so a failed rebuild rolls back to the previous index
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("DROP TABLE IF EXISTS entity_fts")
+            conn.execute("DROP TABLE IF EXISTS meta")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.executemany(
+                "INSERT INTO entity_fts (doc_id, name, aliases, body) VALUES (?, ?, ?, ?)",
+                [
+                    (doc_id, entity.name, " ".join(entity.aliases), text)
+                    for (doc_id, text, _), entity in zip(iter_knowledge_documents(self.store), self.store)
+                ]
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('fingerprint', ?)", (self.store.fingerprint,))
+        logger.info(f"Built keyword index over {len(self.store)} entities in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM entity_fts").fetchone()[0]
+
+    def search(self, query: str, k: int = 3, relative_cutoff: float = 0.5) -> List[KeywordHit]:
+        """Top-k entities by BM25, dropping hits scoring under relative_cutoff of the best one.
+
+        FTS5's bm25() is negative and lower is better.
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id, body, bm25(entity_fts, ?, ?, ?) AS score FROM entity_fts "
+                "WHERE entity_fts MATCH ? ORDER BY score LIMIT ?",
+                (*COLUMN_WEIGHTS, expression, k)
+            ).fetchall()
+        if not rows:
+            return []
+        threshold = rows[0][2] * relative_cutoff
+        return [KeywordHit(doc_id, body, score) for doc_id, body, score in rows if score <= threshold]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from entity_matcher import EntityMatcher
+
+KNOWLEDGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "binondo_knowledge.json")
+
+@dataclass
+class Entity:
+    """One knowledge base entry; fields keep the order they have in the data file"""
+    # declared by hand rather than with dataclass(slots=True), which needs Python 3.10
+    __slots__ = ("key", "kind", "path", "aliases", "fields")
+    key: str
+    kind: str
+    path: Tuple[str, ...]
+    aliases: Tuple[str, ...]
+    fields: Dict[str, Any]
+
+    @property
+    def name(self) -> str:
+        return self.fields.get("name", self.key.replace("_", " ").title())
+
+    @property
+    def category(self) -> str:
+        return self.path[0]
+
+    @property
+    def source(self) -> str:
+        return "/".join(self.path)
+
+class KnowledgeStore:
+    """Entity table loaded from a JSON data file, with its lookup indexes built once.
+
+    Entities are indexed by key, kind, category, alias and field name, so
+    resolving an alias, an entity or an (entity, field) pair is one dict probe.
+    """
+
+    def __init__(self, entities: List[Entity], fingerprint: str):
+        self.fingerprint = fingerprint
+        self.entities: Dict[str, Entity] = {}
+        self.by_kind: Dict[str, List[Entity]] = {}
+        self.by_category: Dict[str, List[Entity]] = {}
+        self.aliases: Dict[str, str] = {}
+        # field name -> {entity key: value}
+        self.by_field: Dict[str, Dict[str, Any]] = {}
+        for entity in entities:
+            if entity.key in self.entities:
+                raise ValueError(f"Duplicate entity key {entity.key!r}")
+            self.entities[entity.key] = entity
+            self.by_kind.setdefault(entity.kind, []).append(entity)
+            self.by_category.setdefault(entity.category, []).append(entity)
+            for alias in entity.aliases:
+                if self.aliases.get(alias, entity.key) != entity.key:
+                    raise ValueError(f"Alias {alias!r} is used by {self.aliases[alias]!r} and {entity.key!r}")
+                self.aliases[alias] = entity.key
+            for field_name, value in entity.fields.items():
+                self.by_field.setdefault(field_name, {})[entity.key] = value
+
+    @classmethod
+    def load(cls, path: str = KNOWLEDGE_PATH) -> "KnowledgeStore":
+        """Read the data file; the fingerprint is a hash of its bytes"""
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw)
+        entities = [
+            Entity(item["key"], item["kind"], tuple(item["path"]), tuple(item.get("aliases", ())), item["fields"])
+            for item in data["entities"]
+        ]
+        return cls(entities, hashlib.sha1(raw).hexdigest())
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __iter__(self) -> Iterator[Entity]:
+        return iter(self.entities.values())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entities
+
+    def get(self, key: str) -> Optional[Entity]:
+        """Entity by key, or None"""
+        return self.entities.get(key)
+
+    def resolve(self, alias: str) -> Optional[Entity]:
+        """Entity for an alias such as "eng bee", or None"""
+        key = self.aliases.get(alias.lower())
+        return self.entities.get(key) if key else None
+
+    def field(self, key: str, field_name: str, default: Any = None) -> Any:
+        """One field of one entity, e.g. field("binondo_church", "architecture")"""
+        return self.by_field.get(field_name, {}).get(key, default)
+
+    def of_kind(self, kind: str) -> List[Entity]:
+        """Every entity of a kind, e.g. "food_spot", in data file order"""
+        return self.by_kind.get(kind, [])
+
+# loaded once per process; edits to the data file take effect on restart
+KNOWLEDGE_STORE = KnowledgeStore.load()
+
+# alias -> entity key, for dynamic responses
+ENTITY_MAPPING = KNOWLEDGE_STORE.aliases
+
+# compiled once per process; matching is a single pass over the query
+ENTITY_MATCHER = EntityMatcher(ENTITY_MAPPING)
+
+def _format_field(field_name: str, value) -> str:
+    label = field_name.replace("_", " ").title()
+    if isinstance(value, list):
+        value = ", ".join(value)
+    return f"{label}: {value}"
+
+def entity_document(entity: Entity) -> str:
+    """Plain-text document for an entity: its name, then one "Label: value" line per field"""
+    lines = [entity.name] + [_format_field(k, v) for k, v in entity.fields.items() if k != "name"]
+    return "\n".join(lines)
+
+def iter_knowledge_documents(store: Optional[KnowledgeStore] = None):
+    """Flatten the knowledge base into (doc_id, text, metadata) documents, one per entity"""
+    for entity in (KNOWLEDGE_STORE if store is None else store):
+        metadata = {"source": entity.source, "category": entity.category, "entity_key": entity.key}
+        yield entity.source, entity_document(entity), metadata
@@ -0,0 +1,55 @@
+import importlib
+import sys
+import threading
+from typing import Any, Dict
+
+# heavy ML modules are only imported when a retrieval or generation path needs them
+_modules: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+def lazy_import(module_name: str) -> Any:
+    """Import a module on first use and reuse it afterwards"""
+    module = _modules.get(module_name)
+    if module is not None:
+        return module
+    with _lock:
+        if module_name not in _modules:
+            _modules[module_name] = importlib.import_module(module_name)
+        return _modules[module_name]
+
+def is_module_loaded(module_name: str) -> bool:
+    """Check whether a module has been imported without importing it"""
+    return module_name in _modules or module_name in sys.modules
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(lazy_import(self._module_name), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if is_module_loaded(self._module_name) else "not loaded"
+        return f"<LazyModule {self._module_name} ({state})>"
+
+def get_torch():
+    """Get the torch module"""
+    return lazy_import("torch")
+
+def get_cross_encoder_class():
+    """Get the sentence-transformers CrossEncoder class"""
+    return lazy_import("sentence_transformers").CrossEncoder
+
+def get_embeddings_class():
+    """Get the LangChain HuggingFaceEmbeddings class"""
+    return lazy_import("langchain.embeddings").HuggingFaceEmbeddings
+
+def get_chroma_class():
+    """Get the LangChain Chroma vector store class"""
+    return lazy_import("langchain.vectorstores").Chroma
+
+def get_text_splitter_class():
+    """Get the RecursiveCharacterTextSplitter class"""
+    return lazy_import("langchain.text_splitter").RecursiveCharacterTextSplitter
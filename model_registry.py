@@ -0,0 +1,228 @@
+import gc
+import logging
+import os
+import threading
+import time
+from itertools import chain
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import lazy_imports
+from config import ModelConfig
+from embedding_engine import cache_slug
+
+logger = logging.getLogger(__name__)
+
+DTYPES = ("float32", "bfloat16", "int8")
+
+class LoadedModel(NamedTuple):
+    tokenizer: Any
+    model: Any
+    device: str
+    dtype: str
+    load_seconds: float
+    memory_bytes: int
+
+def resolve_device(device: str) -> str:
+    """Map "auto" to cuda when available, otherwise cpu"""
+    if device != "auto":
+        return device
+    torch = lazy_imports.get_torch()
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def _conv1d_to_linear(model):
+    """Swap GPT-2 style Conv1D layers for nn.Linear so dynamic quantization can see them"""
+    torch = lazy_imports.get_torch()
+    conv1d_class = lazy_imports.lazy_import("transformers.pytorch_utils").Conv1D
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, conv1d_class):
+                in_features, out_features = child.weight.shape
+                linear = torch.nn.Linear(in_features, out_features)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(parent, name, linear)
+    return model
+
+def _tensor_bytes(value) -> int:
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(v) for v in value)
+    if hasattr(value, "element_size") and hasattr(value, "nelement"):
+        return value.element_size() * value.nelement()
+    return 0
+
+def model_bytes(model) -> int:
+    """Bytes held by a model's weights and buffers, including quantized packed weights"""
+    return sum(_tensor_bytes(value) for value in model.state_dict().values())
+
+def weights_path(weights_dir: str, model_name: str, dtype: str) -> str:
+    """Where the memory-mappable safetensors export of a model lives"""
+    return os.path.join(weights_dir, cache_slug(model_name), f"model-{dtype}.safetensors")
+
+def export_weights(model, path: str):
+    """Write a model's weights as safetensors; renamed into place so concurrent loaders never see a partial file"""
+    safetensors_torch = lazy_imports.lazy_import("safetensors.torch")
+    # non-persistent buffers (rotary inv_freq, attention masks) are left out of the state dict
+    # but a model built on the meta device has no values for them either
+    named = model.state_dict()
+    for name, buffer in model.named_buffers():
+        named.setdefault(name, buffer)
+    # tied tensors are stored once under their first name, e.g. GPT-2's wte rather than lm_head;
+    # load_mapped_model re-ties them
+    tensors, seen = {}, set()
+    for name, tensor in named.items():
+        storage_key = (tensor.data_ptr(), tuple(tensor.shape), tuple(tensor.stride()))
+        if storage_key not in seen:
+            seen.add(storage_key)
+            tensors[name] = tensor.contiguous()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.{os.getpid()}.partial"
+    safetensors_torch.save_file(tensors, partial_path)
+    os.replace(partial_path, path)
+
+def load_mapped_model(model_name: str, path: str):
+    """Causal LM whose parameters are views of a memory-mapped safetensors file.
+
+    The pages belong to the file, so every process that maps it shares one
+    copy through the page cache instead of holding the weights privately.
+    """
+    transformers = lazy_imports.lazy_import("transformers")
+    safetensors_torch = lazy_imports.lazy_import("safetensors.torch")
+    torch = lazy_imports.get_torch()
+    with torch.device("meta"):
+        model = transformers.AutoModelForCausalLM.from_config(transformers.AutoConfig.from_pretrained(model_name))
+    tensors = safetensors_torch.load_file(path)
+    model.load_state_dict(tensors, strict=False, assign=True)
+    # load_state_dict skips non-persistent buffers; a buffer shared between modules is exported
+    # under its first name only
+    assigned = {}
+    for module_name, module in model.named_modules(remove_duplicate=False):
+        for buffer_name, buffer in list(module._buffers.items()):
+            if buffer is not None and buffer.is_meta:
+                tensor = tensors.get(f"{module_name}.{buffer_name}" if module_name else buffer_name,
+                                     assigned.get(id(buffer)))
+                if tensor is not None:
+                    assigned[id(buffer)] = module._buffers[buffer_name] = tensor
+    model.tie_weights()
+    missing = [name for name, tensor in chain(model.named_parameters(), model.named_buffers()) if tensor.is_meta]
+    if missing:
+        raise ValueError(f"{path} has no weights for {', '.join(missing[:3])}")
+    return model
+
+class ModelRegistry:
+    """Process-wide cache of loaded generative models.
+
+    Models are keyed by (model_name, device, dtype), so every session and
+    rerun shares one copy. dtype "int8" applies dynamic quantization to the
+    linear layers and "bfloat16" casts the weights; both target CPU inference.
+    float32 and bfloat16 CPU weights are exported once to weights_dir and
+    memory-mapped from there, so worker processes share them.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str, str], LoadedModel] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+    def _key(self, config: ModelConfig) -> Tuple[str, str, str]:
+        if config.dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype {config.dtype!r}, expected one of {DTYPES}")
+        return (config.model_name, resolve_device(config.device), config.dtype)
+
+    def _load(self, model_name: str, device: str, dtype: str, weights_dir: Optional[str] = None) -> LoadedModel:
+        transformers = lazy_imports.lazy_import("transformers")
+        torch = lazy_imports.get_torch()
+        if dtype == "int8" and device != "cpu":
+            raise ValueError("int8 dynamic quantization is only supported on CPU")
+
+        start = time.perf_counter()
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_name)
+        model = mapped_path = None
+        # quantized weights are rebuilt in each process and cannot be mapped
+        if weights_dir and device == "cpu" and dtype != "int8":
+            mapped_path = weights_path(weights_dir, model_name, dtype)
+        if mapped_path and os.path.exists(mapped_path):
+            try:
+                model = load_mapped_model(model_name, mapped_path)
+            except Exception as e:
+                # e.g. an export missing buffers: load normally and export it again
+                logger.warning(f"Could not map {mapped_path}, loading {model_name} normally: {e}")
+        if model is None:
+            model = transformers.AutoModelForCausalLM.from_pretrained(model_name, low_cpu_mem_usage=True)
+            if dtype == "bfloat16":
+                model = model.to(torch.bfloat16)
+            elif dtype == "int8":
+                model = torch.ao.quantization.quantize_dynamic(
+                    _conv1d_to_linear(model), {torch.nn.Linear}, dtype=torch.qint8
+                )
+            if mapped_path:
+                # reload so this process also keeps the shared mapping rather than a private copy
+                try:
+                    export_weights(model, mapped_path)
+                    model = load_mapped_model(model_name, mapped_path)
+                except Exception as e:
+                    logger.warning(f"Could not map {mapped_path}, keeping {model_name} in private memory: {e}")
+        model = model.to(device)
+        model.eval()
+        load_seconds = time.perf_counter() - start
+        logger.info(f"Loaded {model_name} ({dtype}, {device}) in {load_seconds:.1f}s")
+        return LoadedModel(tokenizer, model, device, dtype, load_seconds, model_bytes(model))
+
+    def get(self, config: ModelConfig) -> LoadedModel:
+        """Return the model for a config, loading it on first use"""
+        key = self._key(config)
+        loaded = self._models.get(key)
+        if loaded is not None:
+            return loaded
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # loads of different models can overlap, loads of the same model cannot
+        with key_lock:
+            if key not in self._models:
+                self._models[key] = self._load(*key, weights_dir=config.weights_dir if config.mmap_weights else None)
+            return self._models[key]
+
+    def is_loaded(self, config: ModelConfig) -> bool:
+        """Check whether a config's model is resident"""
+        return self._key(config) in self._models
+
+    def warmup(self, config: ModelConfig, prompt: str = "Hello"):
+        """Run one short generation so first-call allocations happen before real traffic"""
+        loaded = self.get(config)
+        torch = lazy_imports.get_torch()
+        inputs = loaded.tokenizer(prompt, return_tensors="pt").to(loaded.device)
+        start = time.perf_counter()
+        with torch.inference_mode():
+            loaded.model.generate(**inputs, max_new_tokens=2, pad_token_id=loaded.tokenizer.eos_token_id)
+        logger.info(f"Warmed up {config.model_name} in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def unload(self, config: ModelConfig) -> bool:
+        """Drop a resident model; returns False if it was not loaded"""
+        with self._lock:
+            loaded = self._models.pop(self._key(config), None)
+        if loaded is None:
+            return False
+        del loaded
+        gc.collect()
+        return True
+
+    def memory_footprint(self, config: ModelConfig) -> Optional[int]:
+        """Bytes held by a resident model's weights and buffers, or None if not loaded"""
+        loaded = self._models.get(self._key(config))
+        if loaded is None:
+            return None
+        return loaded.memory_bytes
+
+    def resident(self) -> List[Dict[str, Any]]:
+        """Summary of every resident model for the sidebar"""
+        return [
+            {
+                "model_name": model_name,
+                "device": device,
+                "dtype": dtype,
+                "bytes": loaded.memory_bytes
+            }
+            for (model_name, device, dtype), loaded in list(self._models.items())
+        ]
+
+# shared by every session in the process
+MODEL_REGISTRY = ModelRegistry()
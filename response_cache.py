@@ -0,0 +1,61 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+class ResponseCache:
+    """Memoizes rendered responses keyed by (intent, entity_key, query_type).
+
+    Rendered text only depends on the knowledge base, which is loaded once per
+    process, so entries stay valid until the process restarts.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_render(self, key: Hashable, render: Callable[[], Optional[str]]) -> Optional[str]:
+        """Return the cached response for key, rendering and storing it on a miss"""
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self.hits += 1
+                return response
+            self.misses += 1
+        # rendered outside the lock so one slow render never blocks other sessions
+        response = render()
+        if response is not None:
+            with self._lock:
+                self._entries[key] = response
+        return response
+
+    def warm(self, key: Hashable, render: Callable[[], Optional[str]]):
+        """Render and store a response ahead of time without touching the counters"""
+        if key not in self._entries:
+            response = render()
+            if response is not None:
+                with self._lock:
+                    self._entries[key] = response
+
+    def clear(self):
+        """Drop every cached response and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the sidebar"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+# shared by every session in the process
+RESPONSE_CACHE = ResponseCache()
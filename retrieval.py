@@ -0,0 +1,249 @@
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import streamlit as st
+
+import lazy_imports
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# set once the ML stack turns out to be missing so later queries skip retrieval
+_retrieval_unavailable = False
+
+# hybrid stages left out of the answer being built on this thread, see skipped_stages
+_answer_state = threading.local()
+
+def reset_skipped_stages():
+    """Start tracking skipped retrieval stages for a new answer on this thread"""
+    _answer_state.skipped = []
+
+def skipped_stages() -> List[str]:
+    """Hybrid stages that were busy or over budget on this thread since reset_skipped_stages"""
+    return getattr(_answer_state, "skipped", [])
+
+@st.cache_resource
+def get_embedding_model():
+    """Batched, disk-cached embedding engine, created once per process"""
+    from embedding_engine import create_embedding_engine
+    return create_embedding_engine()
+
+@st.cache_resource
+def get_vector_store():
+    """Chroma handle over the persisted collection, created once per process"""
+    config = get_config().vectorstore
+    chroma_class = lazy_imports.get_chroma_class()
+    store = chroma_class(
+        collection_name=config.collection_name,
+        persist_directory=config.persist_directory,
+        embedding_function=get_embedding_model()
+    )
+    if not store.get(limit=1)["ids"] and config.legacy_collection_name:
+        # fall back to the collection the original notebook persisted
+        store = chroma_class(
+            collection_name=config.legacy_collection_name,
+            persist_directory=config.persist_directory,
+            embedding_function=get_embedding_model()
+        )
+    return store
+
+@st.cache_resource
+def get_vector_index():
+    """In-process numpy/faiss index, loaded once per process"""
+    from vector_index import load_vector_index
+    return load_vector_index(get_config().vectorstore)
+
+@st.cache_resource
+def get_keyword_index():
+    """SQLite FTS5 index over the knowledge base, opened (and built if stale) once per process"""
+    from keyword_index import KeywordIndex
+    return KeywordIndex(get_config().vectorstore.keyword_index_path)
+
+@st.cache_resource
+def get_reranker():
+    """CPU cross-encoder for HybridConfig.rerank_model, loaded once per process"""
+    return lazy_imports.get_cross_encoder_class()(get_config().hybrid.rerank_model, device="cpu")
+
+@st.cache_resource
+def get_hybrid_retriever():
+    """Hybrid retriever over the configured stages with a shared thread pool, created once per process"""
+    from concurrent.futures import ThreadPoolExecutor
+    from hybrid_retrieval import HybridRetriever
+    config = get_config().hybrid
+    stages = {"gazetteer": gazetteer_candidates, "lexical": lexical_candidates, "vector": vector_candidates}
+    reranker = None
+    if config.rerank_model:
+        reranker = lambda query, candidates: get_reranker().predict([(query, c.text) for c in candidates])
+    return HybridRetriever(
+        {name: stages[name] for name in config.stages},
+        budget_ms=config.budget_ms,
+        rrf_k=config.rrf_k,
+        reranker=reranker,
+        rerank_top_n=config.rerank_top_n,
+        executor=ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix="hybrid-retrieval")
+    )
+
+def search(query_embedding, k: int) -> List[Tuple[str, float]]:
+    """Top-k (chunk text, distance) pairs from the configured backend"""
+    if get_config().vectorstore.backend == "chroma":
+        results = get_vector_store().similarity_search_by_vector_with_relevance_scores(query_embedding, k=k)
+        return [(doc.page_content, distance) for doc, distance in results]
+    return [(hit.text, hit.distance) for hit in get_vector_index().search(query_embedding, k)]
+
+def clean_chunk(text: str) -> str:
+    """Strip the indentation the source documents were chunked with"""
+    lines = [line.strip() for line in text.strip().splitlines()]
+    return "\n".join(line for line in lines if line)
+
+def retrieve(query: str, k: Optional[int] = None) -> List[Tuple[str, float]]:
+    """Embed the query and return the top-k (chunk text, distance) pairs"""
+    config = get_config().vectorstore
+    k = k or config.search_k
+
+    start = time.perf_counter()
+    query_embedding = get_embedding_model().embed_query(query)
+    embedded = time.perf_counter()
+    results = search(query_embedding, k)
+    searched = time.perf_counter()
+
+    logger.info(f"Retrieval latency: embed {(embedded - start) * 1000:.1f}ms, "
+                f"search {(searched - embedded) * 1000:.1f}ms, k={k}, backend={config.backend}")
+    return [(text, distance) for text, distance in results if distance <= config.max_distance]
+
+def embed_query(query: str) -> Optional[List[float]]:
+    """Query embedding for the semantic cache, or None if the embedding model is unavailable"""
+    global _retrieval_unavailable
+    if _retrieval_unavailable:
+        return None
+
+    try:
+        return get_embedding_model().embed_query(query)
+    except ImportError as e:
+        logger.warning(f"Retrieval disabled, ML dependencies are missing: {e}")
+        _retrieval_unavailable = True
+    except Exception as e:
+        logger.warning(f"Query embedding failed: {e}")
+    return None
+
+def format_retrieved_response(chunks: List[Tuple[str, float]]) -> str:
+    """Format response from retrieved knowledge base chunks"""
+    sections = "\n\n---\n\n".join(clean_chunk(text) for text, _ in chunks)
+    return f"""📖 **Here's what I found in the Binondo heritage archive:**
+
+{sections}
+
+Ask me about a specific site, food spot or festival for more details! 🏮"""
+
+def retrieve_chunks(query: str) -> List[Tuple[str, float]]:
+    """Retrieve relevant chunks, or nothing if retrieval is unavailable or fails"""
+    global _retrieval_unavailable
+    if _retrieval_unavailable:
+        return []
+
+    try:
+        return retrieve(query)
+    except ImportError as e:
+        logger.warning(f"Retrieval disabled, ML dependencies are missing: {e}")
+        _retrieval_unavailable = True
+    except Exception as e:
+        logger.warning(f"Retrieval failed: {e}")
+    return []
+
+def keyword_search(query: str) -> List[Tuple[str, float]]:
+    """BM25 full-text search over the knowledge base, or nothing if it fails"""
+    config = get_config().vectorstore
+    start = time.perf_counter()
+    try:
+        hits = get_keyword_index().search(query, config.keyword_search_k)
+    except Exception as e:
+        logger.warning(f"Keyword search failed: {e}")
+        return []
+    logger.info(f"Keyword search latency: {(time.perf_counter() - start) * 1000:.2f}ms, {len(hits)} hits")
+    return [(hit.text, hit.score) for hit in hits]
+
+def answer_from_keyword_search(query: str) -> Optional[str]:
+    """Answer from full-text search, or None if no entity matched"""
+    hits = keyword_search(query)
+    return format_retrieved_response(hits) if hits else None
+
+def gazetteer_candidates(query: str, k: int):
+    """Hybrid stage: entities named in the query, in query order"""
+    from hybrid_retrieval import Candidate
+    from knowledge import ENTITY_MATCHER, KNOWLEDGE_STORE, entity_document
+    entities = [KNOWLEDGE_STORE.get(key) for _, key in ENTITY_MATCHER.match(query)]
+    return [Candidate(entity.source, entity_document(entity)) for entity in entities[:k] if entity]
+
+def lexical_candidates(query: str, k: int):
+    """Hybrid stage: BM25 full-text hits"""
+    from hybrid_retrieval import Candidate
+    return [Candidate(hit.id, hit.text) for hit in get_keyword_index().search(query, k)]
+
+def vector_candidates(query: str, k: int):
+    """Hybrid stage: nearest chunks within max_distance, one per knowledge-base entity"""
+    global _retrieval_unavailable
+    from hybrid_retrieval import Candidate
+    if _retrieval_unavailable:
+        return []
+
+    config = get_config().vectorstore
+    try:
+        query_embedding = get_embedding_model().embed_query(query)
+    except ImportError as e:
+        logger.warning(f"Retrieval disabled, ML dependencies are missing: {e}")
+        _retrieval_unavailable = True
+        return []
+    if config.backend == "chroma":
+        results = get_vector_store().similarity_search_by_vector_with_relevance_scores(query_embedding, k=k)
+        hits = [(candidate_id(getattr(doc, "id", None), doc.metadata), doc.page_content, distance)
+                for doc, distance in results]
+    else:
+        hits = [(candidate_id(hit.id, hit.metadata), hit.text, hit.distance)
+                for hit in get_vector_index().search(query_embedding, k)]
+
+    # chunks of the same entity collapse into its best-ranked one
+    candidates = {}
+    for doc_id, text, distance in hits:
+        if distance <= config.max_distance:
+            candidates.setdefault(doc_id or text, Candidate(doc_id or text, text))
+    return list(candidates.values())
+
+def candidate_id(chunk_id: Optional[str], metadata: Optional[dict]) -> Optional[str]:
+    """Fusion id of a vector hit: the entity's source for knowledge-base chunks, else the chunk id"""
+    # knowledge-base chunks fuse with the gazetteer and lexical hits for their entity; chunks of the
+    # legacy notebook collection all share one temp-file source, so they keep their own ids
+    metadata = metadata or {}
+    return metadata.get("source") if metadata.get("entity_key") else chunk_id
+
+def hybrid_chunks(query: str) -> List[Tuple[str, float]]:
+    """(text, fused score) pairs from the hybrid retriever, best first"""
+    config = get_config()
+    try:
+        result = get_hybrid_retriever().retrieve(query, config.vectorstore.search_k,
+                                                 per_stage_k=config.hybrid.candidates_per_stage)
+    except Exception as e:
+        logger.warning(f"Hybrid retrieval failed: {e}")
+        return []
+    # an answer built without them (e.g. while the embedding model loads) must not be cached
+    skipped = [timing.stage for timing in result.timings if timing.status in ("busy", "timeout")]
+    if skipped:
+        _answer_state.skipped = skipped_stages() + skipped
+    return [(candidate.text, candidate.score) for candidate in result.candidates]
+
+def relevant_chunks(query: str) -> List[Tuple[str, float]]:
+    """Chunks from hybrid retrieval or the vector store, depending on AppConfig.retrieval_mode"""
+    if get_config().retrieval_mode == "hybrid":
+        return hybrid_chunks(query)
+    return retrieve_chunks(query)
+
+def answer_from_retrieval(query: str) -> Optional[str]:
+    """Answer from the configured retrieval mode, or None if nothing relevant was retrieved"""
+    chunks = relevant_chunks(query)
+    if not chunks:
+        return None
+
+    start = time.perf_counter()
+    response = format_retrieved_response(chunks)
+    logger.info(f"Retrieval latency: format {(time.perf_counter() - start) * 1000:.1f}ms")
+    return response
@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import get_config
+from lazy_imports import LazyModule
+
+np = LazyModule("numpy")
+
+class SemanticAnswerCache:
+    """LRU cache of answers keyed by query embedding rather than query text.
+
+    Embeddings live in one preallocated (max_size, dim) matrix, so a lookup is
+    a single matrix-vector product; the nearest cached query is a hit when its
+    cosine similarity reaches the threshold. Like ResponseCache it lives as
+    long as the process, and with it the knowledge base its answers came from.
+    """
+
+    def __init__(self, max_size: int = 256, threshold: float = 0.92):
+        self.max_size = max_size
+        self.threshold = threshold
+        self._vectors = None
+        self._active = None
+        self._answers: List[Optional[str]] = [None] * max_size
+        # slot -> None, least recently used first
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _normalize(self, embedding: Sequence[float]):
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _nearest(self, vector):
+        scores = self._vectors @ vector
+        scores[~self._active] = -np.inf
+        slot = int(np.argmax(scores))
+        return slot, float(scores[slot])
+
+    def get(self, embedding: Sequence[float]) -> Optional[str]:
+        """Answer of the most similar cached query, or None below the threshold"""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._lru and self._vectors.shape[1] == vector.shape[0]:
+                slot, similarity = self._nearest(vector)
+                if similarity >= self.threshold:
+                    self._lru.move_to_end(slot)
+                    self.hits += 1
+                    return self._answers[slot]
+            self.misses += 1
+            return None
+
+    def put(self, embedding: Sequence[float], answer: str):
+        """Store an answer, replacing a near-duplicate entry or evicting the least recently used one"""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                self._vectors = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+                self._active = np.zeros(self.max_size, dtype=bool)
+                self._answers = [None] * self.max_size
+                self._lru.clear()
+
+            slot = None
+            if self._lru:
+                nearest, similarity = self._nearest(vector)
+                if similarity >= self.threshold:
+                    slot = nearest
+            if slot is None and len(self._lru) < self.max_size:
+                slot = int(np.argmin(self._active))
+            if slot is None:
+                slot, _ = self._lru.popitem(last=False)
+
+            self._vectors[slot] = vector
+            self._active[slot] = True
+            self._answers[slot] = answer
+            self._lru[slot] = None
+            self._lru.move_to_end(slot)
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._lru.clear()
+            self._answers = [None] * self.max_size
+            if self._active is not None:
+                self._active[:] = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, current size and threshold"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "threshold": self.threshold
+        }
+
+# shared by every session in the process
+SEMANTIC_CACHE = SemanticAnswerCache(
+    max_size=get_config().semantic_cache_max_size,
+    threshold=get_config().semantic_cache_threshold
+)
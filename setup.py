@@ -23,6 +23,15 @@ def download_models():
     
     print("Setup complete!")
 
+def build_knowledge_index():
+    """Embed the knowledge base into the vector store"""
+    print("Building knowledge index")
+    
+    from build_index import build_index
+    
+    counts = build_index()
+    print(f"Index up to date: {counts}")
+
 def create_directories():
     """Create necessary directories"""
     os.makedirs("chroma_db", exist_ok=True)
@@ -34,6 +43,7 @@ if __name__ == "__main__":
     create_directories()
     install_requirements()
     download_models()
+    build_knowledge_index()
     
     print("\n Setup complete!")
     print("Run the app with: streamlit run app.py")
@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_config
+from generation import build_prompt, tokenize_prompts
+
+try:
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import PreTrainedTokenizerFast
+except ImportError:
+    PreTrainedTokenizerFast = None
+
+def word_tokenizer(text: str):
+    """A whitespace tokenizer over the words of text, so no model has to be downloaded"""
+    vocab = {"<unk>": 0, "<eos>": 1}
+    for word in text.split():
+        vocab.setdefault(word, len(vocab))
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    return PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="<unk>", eos_token="<eos>")
+
+@unittest.skipIf(PreTrainedTokenizerFast is None, "transformers is not installed")
+class PromptTruncationTest(unittest.TestCase):
+    def test_long_context_keeps_question(self):
+        chunks = [" ".join(f"note{chunk}-{word}" for word in range(200)) for chunk in range(3)]
+        prompt = build_prompt("When was Binondo Church built?", chunks)
+        tokenizer = word_tokenizer(prompt)
+
+        config = get_config().model
+        input_ids = tokenize_prompts(tokenizer, [prompt])["input_ids"][0]
+        self.assertEqual(len(input_ids), config.max_length - config.max_new_tokens)
+        text = tokenizer.decode(input_ids, skip_special_tokens=True)
+        self.assertTrue(text.endswith("Question: When was Binondo Church built? Answer:"), text[-80:])
+
+if __name__ == "__main__":
+    unittest.main()
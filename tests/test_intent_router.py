@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import INTENT_INDEX, Intent
+from knowledge import ENTITY_MATCHER
+from utils import WELCOME_EXAMPLES, get_suggested_questions
+
+# query -> (intent, first matched entity key), for every question the UI offers
+EXPECTED = {
+    "Tell me about the history of Binondo Church": (Intent("history", "heritage_sites"), "binondo_church"),
+    "What are the must-visit heritage sites in Binondo?": (Intent("general", "heritage_sites"), None),
+    "What traditional foods should I try in Binondo?": (Intent("food", "food"), None),
+    "How did Binondo become the world's oldest Chinatown?": (Intent("general", "history"), None),
+    "What cultural festivals happen in Binondo?": (Intent("general", "cultural"), None),
+    "Where can I find traditional Chinese medicine shops?": (Intent("location", None), None),
+    "What's the significance of Escolta Street?": (Intent("significance", "heritage_sites"), "escolta_street"),
+    "Tell me about Saint Lorenzo Ruiz": (Intent("general", "church"), "binondo_church"),
+    "What are some traditional Chinese-Filipino dishes?": (Intent("general", None), None),
+    "How has Binondo preserved its heritage over 400+ years?": (Intent("general", "heritage_sites"), None),
+    "Give me food spots in Binondo": (Intent("food", "food"), None),
+    "What are Binondo's heritage sites?": (Intent("general", "heritage_sites"), None),
+    "Tell me about cultural festivals": (Intent("general", "cultural"), None),
+    "How did Binondo become the oldest Chinatown?": (Intent("general", "history"), None),
+    "Tell me about Binondo Church": (Intent("general", "heritage_sites"), "binondo_church"),
+    "What is the history of Eng Bee Tin?": (Intent("history", "history"), "eng_bee_tin"),
+}
+
+class IntentRoutingTest(unittest.TestCase):
+    def test_covers_every_suggested_and_welcome_query(self):
+        queries = get_suggested_questions() + [prompt for _, prompt in WELCOME_EXAMPLES]
+        self.assertEqual(set(queries), set(EXPECTED))
+
+    def test_intent(self):
+        for query, (intent, _) in EXPECTED.items():
+            with self.subTest(query=query):
+                self.assertEqual(INTENT_INDEX.classify(query), intent)
+
+    def test_entity(self):
+        for query, (_, entity_key) in EXPECTED.items():
+            with self.subTest(query=query):
+                matches = ENTITY_MATCHER.match(query)
+                self.assertEqual(matches[0][1] if matches else None, entity_key)
+
+    def test_misses_route_nowhere(self):
+        for query in ("Is there parking nearby?", "Can you recommend a hotel?"):
+            with self.subTest(query=query):
+                self.assertEqual(INTENT_INDEX.classify(query), Intent(INTENT_INDEX.default_query_type, None))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+from config import get_config
+
+class _NoopSpan:
+    """Returned while tracing is off or outside a turn, so a disabled span costs one call"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class _Span:
+    __slots__ = ("turn", "name", "attrs", "depth", "start")
+
+    def __init__(self, turn: "_Turn", name: str, attrs: Dict[str, Any]):
+        self.turn = turn
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.depth = self.turn.depth
+        self.turn.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        self.turn.depth -= 1
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.turn.spans.append((self.name, self.start, end, self.depth, threading.get_ident(), self.attrs))
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes, e.g. hit counts, to the span"""
+        self.attrs.update(attrs)
+
+class _Turn:
+    __slots__ = ("tracer", "query", "source", "spans", "depth", "start", "wall_start", "previous")
+
+    def __init__(self, tracer: "Tracer", query: str, source: str):
+        self.tracer = tracer
+        self.query = query
+        self.source = source
+        self.spans: List[tuple] = []
+        self.depth = 0
+
+    def __enter__(self):
+        local = self.tracer._local
+        self.previous = getattr(local, "turn", None)
+        local.turn = self
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        self.tracer._local.turn = self.previous
+        self.tracer._finish(self, end)
+        return False
+
+    def set(self, **attrs):
+        pass
+
+class Tracer:
+    """Per-turn span recorder for the chat pipeline.
+
+    A turn (one chat message or API request) collects the spans opened on its
+    thread; when it ends it is kept in memory for the performance panel and
+    appended to turns.jsonl plus a Chrome trace (trace.json, open it in
+    chrome://tracing or Perfetto). While disabled, span() and traced() only
+    test a flag.
+    """
+
+    def __init__(self, enabled: bool = False, trace_dir: Optional[str] = None, max_turns: int = 20):
+        self.enabled = enabled
+        self.trace_dir = trace_dir
+        self.turns: deque = deque(maxlen=max_turns)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def turn(self, query: Optional[str], source: str = "ui"):
+        """Context manager around one chat turn; a no-op for an empty query, e.g. a rerun without input"""
+        if not self.enabled or not query:
+            return NOOP_SPAN
+        return _Turn(self, query, source)
+
+    def span(self, name: str, **attrs):
+        """Context manager timing one stage of the current turn"""
+        if not self.enabled:
+            return NOOP_SPAN
+        turn = getattr(self._local, "turn", None)
+        if turn is None:
+            return NOOP_SPAN
+        return _Span(turn, name, attrs)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """Decorator recording each call of a function as a span"""
+        def decorate(fn):
+            span_name = name or fn.__name__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _finish(self, turn: _Turn, end: float):
+        spans = [
+            {
+                "name": name,
+                "start_ms": (start - turn.start) * 1000,
+                "duration_ms": (span_end - start) * 1000,
+                "depth": depth,
+                "thread": thread,
+                "attrs": attrs,
+            }
+            for name, start, span_end, depth, thread, attrs in sorted(turn.spans, key=lambda s: s[1])
+        ]
+        record = {
+            "query": turn.query[:100],
+            "source": turn.source,
+            "timestamp": turn.wall_start,
+            "duration_ms": (end - turn.start) * 1000,
+            "spans": spans,
+        }
+        self.turns.append(record)
+        if self.trace_dir:
+            self._export(record)
+
+    def _export(self, record: Dict[str, Any]):
+        pid = os.getpid()
+        origin_us = record["timestamp"] * 1e6
+        events = [{
+            "name": "turn", "ph": "X", "pid": pid, "tid": threading.get_ident(),
+            "ts": origin_us, "dur": record["duration_ms"] * 1000,
+            "args": {"query": record["query"], "source": record["source"]},
+        }]
+        for span in record["spans"]:
+            events.append({
+                "name": span["name"], "ph": "X", "pid": pid, "tid": span["thread"],
+                "ts": origin_us + span["start_ms"] * 1000, "dur": span["duration_ms"] * 1000,
+                "args": span["attrs"],
+            })
+
+        with self._write_lock:
+            os.makedirs(self.trace_dir, exist_ok=True)
+            with open(os.path.join(self.trace_dir, "turns.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            # Chrome's JSON array format allows the closing bracket to be missing,
+            # so events can be appended without rewriting the file
+            chrome_path = os.path.join(self.trace_dir, "trace.json")
+            new_file = not os.path.exists(chrome_path)
+            with open(chrome_path, "a", encoding="utf-8") as f:
+                if new_file:
+                    f.write("[\n")
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False) + ",\n")
+
+    def recent_turns(self, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The most recent turns, newest first"""
+        turns = list(self.turns)[::-1]
+        return turns[:count] if count else turns
+
+# shared by every session in the process
+TRACER = Tracer(
+    enabled=get_config().tracing_enabled,
+    trace_dir=get_config().trace_dir,
+    max_turns=get_config().trace_turns
+)
+turn = TRACER.turn
+span = TRACER.span
+traced = TRACER.traced
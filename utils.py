@@ -1,7 +1,17 @@
 import streamlit as st
-import torch
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
+from interaction_log import INTERACTION_LOG, log_interaction
+from lazy_imports import LazyModule, is_module_loaded
+from response_cache import RESPONSE_CACHE
+from semantic_cache import SEMANTIC_CACHE
+from model_registry import MODEL_REGISTRY
+from generation import generation_scheduler_stats
+from tracing import TRACER
+from warmup import warmup_stats
+from worker_pool import worker_pool_stats
+
+torch = LazyModule("torch")
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -9,6 +19,15 @@ logger = logging.getLogger(__name__)
 
 def check_gpu_availability() -> Dict[str, Any]:
     """Check GPU availability and return system info"""
+    # avoid pulling in torch just to render the sidebar
+    if not is_module_loaded("torch"):
+        return {
+            "cuda_available": False,
+            "device_count": 0,
+            "current_device": None,
+            "device_name": "CPU"
+        }
+    
     info = {
         "cuda_available": torch.cuda.is_available(),
         "device_count": torch.cuda.device_count() if torch.cuda.is_available() else 0,
@@ -39,6 +58,16 @@ def get_suggested_questions() -> List[str]:
         "How has Binondo preserved its heritage over 400+ years?"
     ]
 
+# (topic, prompt) pairs shown in app.py's welcome message and answered by the warm-up
+WELCOME_EXAMPLES = [
+    ("🍜 Food Spots", "Give me food spots in Binondo"),
+    ("🏛️ Heritage Sites", "What are Binondo's heritage sites?"),
+    ("🎭 Cultural Traditions", "Tell me about cultural festivals"),
+    ("📚 History", "How did Binondo become the oldest Chinatown?"),
+    ("⛪ Specific Sites", "Tell me about Binondo Church"),
+    ("🥟 Specific Places", "What is the history of Eng Bee Tin?"),
+]
+
 def display_system_info():
     """Display system information in sidebar"""
     gpu_info = check_gpu_availability()
@@ -59,6 +88,80 @@ def display_system_info():
             st.sidebar.info(f"🧠 GPU Memory: {memory_allocated:.1f}GB / {memory_reserved:.1f}GB")
         except:
             pass
+    
+    warmup = warmup_stats()
+    if warmup and warmup["running"]:
+        st.sidebar.progress(
+            warmup["done"] / max(warmup["total"], 1),
+            text=f"🔥 Warming up: {warmup['done']}/{warmup['total']} answers"
+        )
+    elif warmup:
+        models = ", ".join(f"{name} {status}" for name, status in warmup["models"].items())
+        st.sidebar.info(
+            f"🔥 Warm-up: {warmup['done'] - warmup['failed']}/{warmup['total']} answers ready "
+            f"in {warmup['elapsed_s']:.1f}s" + (f" - {models}" if models else "")
+        )
+    
+    for model_info in MODEL_REGISTRY.resident():
+        st.sidebar.info(
+            f"🤖 Model: {model_info['model_name']} ({model_info['dtype']}, {model_info['device']}) "
+            f"- {model_info['bytes'] / 1024**2:.0f} MB RAM"
+        )
+    
+    batch_stats = generation_scheduler_stats()
+    if batch_stats and batch_stats["batches"]:
+        st.sidebar.info(
+            f"📦 Generation Batching: {batch_stats['batches']} batches, "
+            f"avg size {batch_stats['mean_batch_size']:.1f}, queue depth {batch_stats['queue_depth']}"
+        )
+    
+    pool_stats = worker_pool_stats()
+    if pool_stats:
+        st.sidebar.info(
+            f"🧵 Worker Pool: {pool_stats['workers']} processes, {pool_stats['pss_mb']:.0f} MB PSS "
+            f"({pool_stats['rss_mb']:.0f} MB RSS incl. shared pages)"
+        )
+    
+    cache_stats = RESPONSE_CACHE.stats()
+    st.sidebar.info(
+        f"⚡ Response Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} cached"
+    )
+    
+    log_stats = INTERACTION_LOG.stats()
+    if log_stats["written"] or log_stats["dropped"]:
+        st.sidebar.info(
+            f"📝 Interaction Log: {log_stats['written']} written, {log_stats['dropped']} dropped, "
+            f"queue depth {log_stats['queue_depth']}"
+        )
+    
+    semantic_stats = SEMANTIC_CACHE.stats()
+    if semantic_stats["hits"] or semantic_stats["misses"]:
+        st.sidebar.info(
+            f"🧭 Semantic Cache: {semantic_stats['hits']} hits / {semantic_stats['misses']} misses "
+            f"({semantic_stats['hit_rate']:.0%}), {semantic_stats['entries']} cached"
+        )
+
+def display_performance_panel(count: int = 5):
+    """Per-stage timings of the last traced chat turns"""
+    st.markdown("### ⏱️ Performance")
+    turns = TRACER.recent_turns(count)
+    if not turns:
+        st.caption("No traced turns yet")
+        return
+    
+    for position, turn in enumerate(turns):
+        with st.expander(f"{turn['duration_ms']:.1f} ms · {turn['query'][:40]}", expanded=position == 0):
+            lines = []
+            for span in turn["spans"]:
+                details = ", ".join(f"{key}={value}" for key, value in span["attrs"].items())
+                lines.append(
+                    f"{'  ' * span['depth']}- `{span['name']}` {span['duration_ms']:.2f} ms"
+                    + (f" ({details})" if details else "")
+                )
+            untraced_ms = turn["duration_ms"] - sum(span["duration_ms"] for span in turn["spans"] if span["depth"] == 0)
+            lines.append(f"- other {max(untraced_ms, 0.0):.2f} ms")
+            st.markdown("\n".join(lines))
 
 def create_download_link(text: str, filename: str) -> str:
     """Create a download link for text content"""
@@ -66,10 +169,10 @@ def create_download_link(text: str, filename: str) -> str:
     b64 = base64.b64encode(text.encode()).decode()
     return f'<a href="data:text/plain;base64,{b64}" download="{filename}">Download {filename}</a>'
 
-def log_user_interaction(user_input: str, bot_response: str):
-    """Log user interactions for analytics (optional)"""
-    logger.info(f"User Query: {user_input[:100]}...")
-    logger.info(f"Bot Response Length: {len(bot_response)} characters")
+def log_user_interaction(user_input: str, bot_response: str, latency_ms: Optional[float] = None,
+                         cache_hit: Optional[bool] = None, session_id: Optional[str] = None):
+    """Log user interactions for analytics; queued and written by a background thread"""
+    log_interaction(user_input, bot_response, latency_ms=latency_ms, cache_hit=cache_hit, session_id=session_id)
 
 class StreamlitLogger:
     """Custom logger for Streamlit apps"""
@@ -0,0 +1,178 @@
+import logging
+import os
+import sqlite3
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import lazy_imports
+from config import VectorStoreConfig
+from index_snapshot import SNAPSHOT_FILENAME, BlobColumn, ChromaQueuePurged, IndexSnapshot, read_chroma_collection, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+class SearchHit(NamedTuple):
+    id: str
+    text: str
+    metadata: Dict
+    distance: float
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows into a contiguous float32 matrix"""
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class NumpyVectorIndex:
+    """Brute-force index over normalized embeddings held in one float32 matrix.
+
+    Distances are squared L2 between unit vectors (2 - 2 * cosine), the same
+    scale Chroma's default l2 space reports, so VectorStoreConfig.max_distance
+    means the same thing for every backend.
+    """
+
+    def __init__(self, vectors: np.ndarray, texts: Sequence[str], metadatas: Optional[Sequence[Dict]] = None,
+                 ids: Optional[Sequence[str]] = None, normalized: bool = False):
+        self.matrix = vectors if normalized else normalize_rows(vectors)
+        # snapshot columns stay lazy, so opening one decodes nothing
+        self.texts = texts if isinstance(texts, BlobColumn) else list(texts)
+        metadatas = metadatas if metadatas is not None else [{}] * len(self.texts)
+        self.metadatas = metadatas if isinstance(metadatas, BlobColumn) else [metadata or {} for metadata in metadatas]
+        ids = ids if ids is not None else [str(i) for i in range(len(self.texts))]
+        self.ids = ids if isinstance(ids, BlobColumn) else list(ids)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def _top_k(self, query_vector: np.ndarray, k: int):
+        scores = self.matrix @ query_vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return top, scores[top]
+
+    def search(self, query_vector, k: int = 3) -> List[SearchHit]:
+        """Top-k nearest chunks to the query embedding"""
+        if not len(self):
+            return []
+        query = normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[0]
+        rows, scores = self._top_k(query, k)
+        return [
+            SearchHit(self.ids[row], self.texts[row], self.metadatas[row], float(2.0 - 2.0 * score))
+            for row, score in zip(rows, scores)
+        ]
+
+    def save(self, path: str):
+        """Write the index as one snapshot file, see index_snapshot"""
+        write_snapshot(os.path.join(path, SNAPSHOT_FILENAME), self.matrix, self.texts, self.metadatas, self.ids)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, **kwargs):
+        """Open a saved index; vectors and chunks are memory-mapped and decoded on access by default"""
+        snapshot = IndexSnapshot(os.path.join(path, SNAPSHOT_FILENAME))
+        if mmap:
+            return cls(snapshot.vectors, snapshot.texts, snapshot.metadatas, snapshot.ids, normalized=True, **kwargs)
+        return cls(np.array(snapshot.vectors), list(snapshot.texts), list(snapshot.metadatas),
+                   list(snapshot.ids), normalized=True, **kwargs)
+
+    @classmethod
+    def from_chroma(cls, persist_directory: str, collection_name: str, **kwargs):
+        """Copy every embedding, document and metadata out of a persisted Chroma collection"""
+        chromadb = lazy_imports.lazy_import("chromadb")
+        collection = chromadb.PersistentClient(path=persist_directory).get_collection(collection_name)
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        vectors = np.asarray(data["embeddings"], dtype=np.float32).reshape(len(data["ids"]), -1)
+        return cls(vectors, data["documents"], data["metadatas"], data["ids"], **kwargs)
+
+    @classmethod
+    def from_chroma_sqlite(cls, persist_directory: str, collection_name: str, **kwargs):
+        """Same as from_chroma, read straight from chroma.sqlite3 without starting chromadb"""
+        ids, vectors, documents, metadatas = read_chroma_collection(persist_directory, collection_name)
+        return cls(vectors, documents, metadatas, ids, **kwargs)
+
+    def export_to_chroma(self, persist_directory: str, collection_name: str, batch_size: int = 256):
+        """Upsert the index into a persisted Chroma collection"""
+        chromadb = lazy_imports.lazy_import("chromadb")
+        collection = chromadb.PersistentClient(path=persist_directory).get_or_create_collection(collection_name)
+        for start in range(0, len(self), batch_size):
+            end = start + batch_size
+            collection.upsert(
+                ids=self.ids[start:end],
+                embeddings=self.matrix[start:end].tolist(),
+                documents=self.texts[start:end],
+                metadatas=[metadata or None for metadata in self.metadatas[start:end]]
+            )
+
+class FaissVectorIndex(NumpyVectorIndex):
+    """Same interface, answered by a FAISS inner-product flat or HNSW index"""
+
+    def __init__(self, vectors: np.ndarray, texts: List[str], metadatas: Optional[List[Dict]] = None,
+                 ids: Optional[List[str]] = None, normalized: bool = False,
+                 index_type: str = "flat", hnsw_m: int = 32):
+        super().__init__(vectors, texts, metadatas, ids, normalized)
+        faiss = lazy_imports.lazy_import("faiss")
+        if index_type == "hnsw":
+            self.faiss_index = faiss.IndexHNSWFlat(self.dimension, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        else:
+            self.faiss_index = faiss.IndexFlatIP(self.dimension)
+        if len(self):
+            self.faiss_index.add(np.ascontiguousarray(self.matrix))
+
+    def _top_k(self, query_vector: np.ndarray, k: int):
+        scores, rows = self.faiss_index.search(query_vector.reshape(1, -1), min(k, len(self)))
+        keep = rows[0] >= 0
+        return rows[0][keep], scores[0][keep]
+
+BACKENDS = {
+    "numpy": NumpyVectorIndex,
+    "faiss": FaissVectorIndex,
+}
+
+def load_vector_index(config: VectorStoreConfig) -> NumpyVectorIndex:
+    """Open the configured in-process backend, exporting it from chroma_db on first use"""
+    index_class = BACKENDS[config.backend]
+    kwargs = {"index_type": config.faiss_index_type} if config.backend == "faiss" else {}
+    if os.path.exists(os.path.join(config.index_path, SNAPSHOT_FILENAME)):
+        return index_class.load(config.index_path, **kwargs)
+
+    collection_names = [name for name in (config.collection_name, config.legacy_collection_name) if name]
+    # chroma.sqlite3 first: opening it through chromadb rewrites the file
+    unreadable = []
+    error = None
+    for collection_name in collection_names:
+        try:
+            index = index_class.from_chroma_sqlite(config.persist_directory, collection_name, **kwargs)
+        except (ChromaQueuePurged, sqlite3.Error) as e:
+            logger.info(f"Reading {collection_name!r} through chromadb instead: {e}")
+            unreadable.append(collection_name)
+            error = e
+            continue
+        except ImportError:
+            raise
+        except Exception as e:
+            logger.info(f"Cannot read {collection_name!r} from chroma.sqlite3: {e}")
+            error = e
+            continue
+        if len(index):
+            index.save(config.index_path)
+            return index
+
+    # only chromadb can read back vectors it has flushed out of the queue, or a schema this reader predates
+    for collection_name in unreadable:
+        try:
+            index = index_class.from_chroma(config.persist_directory, collection_name, **kwargs)
+        except ImportError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cannot read {collection_name!r} through chromadb: {e}")
+            error = e
+            continue
+        if len(index):
+            index.save(config.index_path)
+            return index
+    raise ValueError(f"No Chroma collection to build the {config.backend} index from") from error
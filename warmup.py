@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# first-call costs (weight load, allocator growth, kernel selection) paid once before any user arrives
+WARM_PROMPT = "Tell me about Binondo"
+
+def warm_embedding_model():
+    from retrieval import embed_query
+    if embed_query(WARM_PROMPT) is None:
+        raise RuntimeError("embedding model unavailable")
+
+def warm_generator():
+    from generation import build_prompt, generate_answer
+    # generate_answer logs and swallows failures
+    if generate_answer(build_prompt(WARM_PROMPT)) is None:
+        raise RuntimeError("generation failed")
+
+def warm_reranker():
+    from retrieval import get_reranker
+    get_reranker().predict([(WARM_PROMPT, WARM_PROMPT)])
+
+def model_warmups() -> Dict[str, Callable[[], Any]]:
+    """Models the configured pipeline will call, by name"""
+    config = get_config()
+    warmups = {}
+    if config.enable_retrieval or config.semantic_cache_enabled:
+        warmups["embedding"] = warm_embedding_model
+    if config.model.enable_generation:
+        warmups["generation"] = warm_generator
+    if config.enable_retrieval and config.retrieval_mode == "hybrid" and config.hybrid.rerank_model:
+        warmups["rerank"] = warm_reranker
+    return warmups
+
+class Warmup:
+    """Routes the expected first questions through the full pipeline at startup.
+
+    Models are warmed first, one at a time so their loads do not compete; the
+    queries then run on a small thread pool, filling the answer, response,
+    semantic and embedding caches and the retrieval indexes. Progress is read
+    by the sidebar while it runs.
+    """
+
+    def __init__(self, queries: List[str], max_workers: int = 4):
+        self.queries = queries
+        self.max_workers = max_workers
+        self.models: Dict[str, str] = {}
+        self.done = 0
+        self.failed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.queries)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self.finished_at is None
+
+    def start(self) -> "Warmup":
+        """Run in a background thread; later calls are no-ops"""
+        with self._lock:
+            if self._thread is None:
+                self.started_at = time.perf_counter()
+                self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+                self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the warm-up finished; returns False on timeout"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished_at is not None
+
+    def _run(self):
+        from chatbot import answer_query, sync_knowledge
+
+        try:
+            sync_knowledge()
+            for name, warm in model_warmups().items():
+                self.models[name] = "warming"
+                start = time.perf_counter()
+                try:
+                    warm()
+                    self.models[name] = f"{(time.perf_counter() - start):.1f}s"
+                except Exception as e:
+                    logger.warning(f"Warm-up of the {name} model failed: {e}")
+                    self.models[name] = "unavailable"
+
+            def warm_query(query):
+                try:
+                    answer_query(query)
+                except Exception as e:
+                    logger.warning(f"Warm-up query failed: {query!r}: {e}")
+                    with self._lock:
+                        self.failed += 1
+                with self._lock:
+                    self.done += 1
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="warmup") as executor:
+                list(executor.map(warm_query, self.queries))
+        finally:
+            self.finished_at = time.perf_counter()
+            logger.info(f"Warm-up: {self.done} queries ({self.failed} failed) in "
+                        f"{self.finished_at - self.started_at:.1f}s, models {self.models}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Progress for the sidebar"""
+        end = self.finished_at or time.perf_counter()
+        return {
+            "running": self.running,
+            "done": self.done,
+            "failed": self.failed,
+            "total": self.total,
+            "elapsed_s": end - self.started_at if self.started_at else 0.0,
+            "models": dict(self.models),
+        }
+
+def warmup_queries() -> List[str]:
+    """Suggested questions and welcome-message examples, the bulk of first questions"""
+    from utils import WELCOME_EXAMPLES, get_suggested_questions
+    queries = get_suggested_questions() + [prompt for _, prompt in WELCOME_EXAMPLES]
+    return list(dict.fromkeys(queries))
+
+_warmup: Optional[Warmup] = None
+_warmup_lock = threading.Lock()
+
+def start_warmup() -> Warmup:
+    """Start the process-wide warm-up once and return it"""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = Warmup(warmup_queries(), max_workers=get_config().warmup_workers)
+        return _warmup.start()
+
+def warmup_stats() -> Optional[Dict[str, Any]]:
+    """Progress of the warm-up, or None if it was never started"""
+    return _warmup.stats() if _warmup is not None else None
@@ -0,0 +1,190 @@
+"""Process pool that answers queries outside the front-end process.
+
+Embedding and generation are CPU-bound and serialize on the GIL in a single
+Streamlit process. With ServingConfig.workers > 0, chatbot.answer_query
+sends cache misses to a pool of worker processes instead. Workers map the
+same files: the vector index snapshot (index_snapshot) and embedding cache
+are memory-mapped, the keyword index is read through SQLite's mmap, and model
+weights come from the safetensors export mapped by model_registry. Each of
+these lives once in the OS page cache no matter how many workers map it.
+Workers write to none of them; query embeddings stay in each worker's memory.
+Knowledge and per-process caches are small and loaded per worker. A broken
+pool is restarted. A request that times out while still queued is withdrawn
+and answered in-process; one a worker already started is left to it.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import ModelConfig, ServingConfig, get_config
+
+logger = logging.getLogger(__name__)
+
+# set in worker processes so answer_query never re-enters the pool
+_in_worker = False
+
+# answer for a request a worker is still computing past ServingConfig.request_timeout
+TIMEOUT_REPLY = "Sorry, that question is taking longer than usual. Please try again in a moment."
+
+def _init_worker(threads_per_worker: int, started):
+    global _in_worker
+    _in_worker = True
+    # the executor keeps no public handle on its processes, so each reports its own pid
+    started.put(os.getpid())
+    # before torch is imported: parallelism comes from the processes, not threads within each
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ.setdefault(variable, str(threads_per_worker))
+
+    import chatbot
+    chatbot.sync_knowledge()
+    config = get_config()
+    if config.model.enable_generation:
+        from model_registry import MODEL_REGISTRY
+        MODEL_REGISTRY.get(config.model)
+
+def worker_answer(query: str) -> Tuple[str, bool]:
+    import chatbot
+    return chatbot.compute_answer(query)
+
+def worker_embed(text: str) -> List[float]:
+    from retrieval import get_embedding_model
+    return get_embedding_model().embed_query(text)
+
+def worker_generate(prompt: str, model_config: Optional[ModelConfig] = None, max_new_tokens: int = 32) -> str:
+    """Greedy completion of a prompt with a registry model; used by the scaling benchmark"""
+    import lazy_imports
+    from model_registry import MODEL_REGISTRY
+    loaded = MODEL_REGISTRY.get(model_config or get_config().model)
+    torch = lazy_imports.get_torch()
+    inputs = loaded.tokenizer(prompt, return_tensors="pt").to(loaded.device)
+    with torch.inference_mode():
+        output = loaded.model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False,
+                                       pad_token_id=loaded.tokenizer.eos_token_id)
+    return loaded.tokenizer.decode(output[0, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+
+def _worker_pid(_=None) -> int:
+    return os.getpid()
+
+def prepare_shared_files():
+    """Build every index file the workers map before any of them starts, so they never race to build one"""
+    from retrieval import get_keyword_index, get_vector_index
+    config = get_config()
+    if config.enable_keyword_search:
+        get_keyword_index()
+    if config.enable_retrieval and config.vectorstore.backend != "chroma":
+        try:
+            get_vector_index()
+        except Exception as e:
+            logger.warning(f"Vector index unavailable to workers: {e}")
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """RSS and proportional set size (shared pages divided among the processes mapping them) in MB, Linux only"""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("Rss", "Pss", "Pss_Anon", "Pss_File", "Shared_Clean"):
+                    memory[name.lower()] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return memory
+
+class WorkerPool:
+    """Fixed pool of worker processes running the answer pipeline"""
+
+    def __init__(self, config: ServingConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        prepare_shared_files()
+        self.executor = self._create_executor()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context(self.config.start_method)
+        self._started = context.SimpleQueue()
+        self._pids: List[int] = []
+        return ProcessPoolExecutor(
+            max_workers=self.config.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.config.threads_per_worker, self._started),
+        )
+
+    def submit(self, fn: Callable, *args):
+        return self.executor.submit(fn, *args)
+
+    def answer(self, query: str) -> Tuple[str, bool]:
+        """chatbot.compute_answer in a worker, or in this process if it never reached one or the pool broke"""
+        executor = self.executor
+        future = executor.submit(worker_answer, query)
+        try:
+            return future.result(timeout=self.config.request_timeout)
+        except FutureTimeoutError:
+            if not future.cancel():
+                # a worker is already on it; computing it here as well would double the load
+                logger.warning(f"Worker still answering after {self.config.request_timeout}s: {query!r}")
+                return TIMEOUT_REPLY, False
+            logger.warning(f"Request queued for {self.config.request_timeout}s, answering in-process")
+        except BrokenProcessPool as e:
+            logger.warning(f"Worker pool broke, restarting it and answering in-process: {e}")
+            self.restart(executor)
+        import chatbot
+        return chatbot.compute_answer(query)
+
+    def restart(self, broken: Optional[ProcessPoolExecutor] = None):
+        """Replace the executor; with broken given, only if no other caller has replaced it yet"""
+        with self._lock:
+            if broken is not None and self.executor is not broken:
+                return
+            old, self.executor = self.executor, self._create_executor()
+        old.shutdown(wait=False, cancel_futures=True)
+
+    def start(self) -> List[int]:
+        """Start and initialize every worker now instead of on first use; returns their pids"""
+        # a worker is spawned for each task that finds no idle one
+        list(self.executor.map(_worker_pid, range(self.config.workers)))
+        return self.pids()
+
+    def pids(self) -> List[int]:
+        with self._lock:
+            while not self._started.empty():
+                self._pids.append(self._started.get())
+            return sorted(self._pids)
+
+    def memory(self) -> Dict[int, Dict[str, float]]:
+        """Per-worker memory, see process_memory"""
+        return {pid: process_memory(pid) for pid in self.pids()}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+def get_worker_pool() -> Optional[WorkerPool]:
+    """The process-wide pool, or None when serving in-process or inside a worker"""
+    global _pool
+    config = get_config().serving
+    if config.workers <= 0 or _in_worker:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool(config)
+    return _pool
+
+def worker_pool_stats() -> Optional[Dict[str, Any]]:
+    """Worker count and memory for the sidebar, or None if no pool is running"""
+    if _pool is None:
+        return None
+    memory = _pool.memory()
+    return {
+        "workers": _pool.config.workers,
+        "rss_mb": sum(m.get("rss", 0.0) for m in memory.values()),
+        "pss_mb": sum(m.get("pss", 0.0) for m in memory.values()),
+    }